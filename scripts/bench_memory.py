@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import resource
+from collections.abc import Callable
+
+import numpy as np
+
+from image_edit_dataset_factory.utils.color_lut import apply_luts, color_tone_table
+from image_edit_dataset_factory.utils.mask_ops import dilate_mask
+from image_edit_dataset_factory.utils.metrics import masked_diff_stats, ssim_rgb, ssim_rgb_tiled
+
+
+def _legacy_qa(src: np.ndarray, res: np.ndarray, allowed: np.ndarray) -> None:
+    # Pre-rework check_non_edit_region math: float32/int16 copies plus two full-frame copies.
+    outside = allowed == 0
+    src_out = src[outside]
+    res_out = res[outside]
+    np.mean((src_out.astype(np.float32) - res_out.astype(np.float32)) ** 2)
+    np.mean(np.any(np.abs(src_out.astype(np.int16) - res_out.astype(np.int16)) > 2, axis=1))
+    src_masked = src.copy()
+    res_masked = res.copy()
+    src_masked[allowed > 0] = res_masked[allowed > 0]
+    ssim_rgb(src_masked, res_masked)
+
+
+def _current_qa(src: np.ndarray, res: np.ndarray, allowed: np.ndarray) -> None:
+    outside = allowed == 0
+    masked_diff_stats(src, res, outside)
+    ssim_rgb_tiled(src, res, ignore=~outside)
+
+
+def _legacy_consistency(src: np.ndarray, res: np.ndarray, allowed: np.ndarray) -> None:
+    region = allowed > 0
+    temp = src.copy().astype(np.float32)
+    temp[region, 0] *= 1.03
+    temp[region, 2] *= 0.97
+    np.clip(temp, 0, 255).astype(np.uint8)
+
+
+def _current_consistency(src: np.ndarray, res: np.ndarray, allowed: np.ndarray) -> None:
+    apply_luts(src, color_tone_table(0.03), region=allowed > 0)
+
+
+CASES: dict[str, Callable[[np.ndarray, np.ndarray, np.ndarray], None]] = {
+    "qa_legacy": _legacy_qa,
+    "qa_current": _current_qa,
+    "consistency_legacy": _legacy_consistency,
+    "consistency_current": _current_consistency,
+}
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is reported in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _measure(case: str, size: int, queue: mp.Queue) -> None:
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    res = src.copy()
+    mask = np.zeros((size, size), dtype=np.uint8)
+    mask[size // 4 : size // 2, size // 4 : size // 2] = 255
+    res[mask > 0] = 0
+    allowed = dilate_mask(mask, 8)
+    baseline = _peak_rss_mib()
+    CASES[case](src, res, allowed)
+    queue.put(_peak_rss_mib() - baseline)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Peak RSS per sample for QA and generator math")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096])
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    args = parser.parse_args()
+
+    # A fresh process per case keeps the high-water mark of earlier cases out of the reading.
+    ctx = mp.get_context("spawn")
+    for size in args.sizes:
+        for case in args.cases:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_measure, args=(case, size, queue))
+            proc.start()
+            delta = queue.get()
+            proc.join()
+            print(f"size={size} case={case} peak_rss_delta_mib={delta:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
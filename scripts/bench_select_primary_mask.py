@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+# The benchmark targets the module-private selector on purpose: it is the hot path being
+# measured, and there is no public wrapper around it.
+from image_edit_dataset_factory.pipeline.decompose import _select_primary_mask
+from image_edit_dataset_factory.utils.mask_ops import alpha_to_mask, mask_from_bbox, refine_mask
+
+
+def _legacy_select_primary_mask(shape: tuple[int, ...], alphas: list[np.ndarray]) -> np.ndarray:
+    # Pre-vectorization implementation: refine every layer, then filter by area ratio.
+    candidates: list[tuple[float, np.ndarray]] = []
+    total = shape[0] * shape[1]
+    for alpha in alphas:
+        mask = refine_mask(alpha_to_mask(alpha), kernel_size=3, iterations=1)
+        candidates.append((float((mask > 0).sum() / total), mask))
+    candidates = [item for item in candidates if 0.01 <= item[0] <= 0.9]
+    if candidates:
+        candidates.sort(key=lambda x: x[0])
+        return candidates[0][1]
+    h, w = shape[:2]
+    return mask_from_bbox((h, w), (w // 4, h // 4, (3 * w) // 4, (3 * h) // 4))
+
+
+def _make_layers(size: int, count: int, seed: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    alphas = [np.full((size, size), 255, dtype=np.uint8)]
+    for _ in range(count - 1):
+        alpha = np.zeros((size, size), dtype=np.uint8)
+        x0, y0 = rng.integers(0, size // 2, size=2)
+        w, h = rng.integers(size // 16, size // 2, size=2)
+        alpha[y0 : y0 + h, x0 : x0 + w] = 255
+        alphas.append(alpha)
+    return alphas
+
+
+SelectFn = Callable[[tuple[int, int], list[np.ndarray]], np.ndarray]
+
+
+def _time(fn: SelectFn, shape: tuple[int, int], alphas: list[np.ndarray], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(shape, alphas)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark primary mask selection")
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--layers", type=int, nargs="+", default=[8, 12, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    shape = (args.size, args.size)
+    for count in args.layers:
+        alphas = _make_layers(args.size, count, seed=count)
+        legacy = _time(_legacy_select_primary_mask, shape, alphas, args.repeat)
+        current = _time(_select_primary_mask, shape, alphas, args.repeat)
+        print(
+            f"size={args.size} layers={count} legacy_ms={legacy * 1e3:.2f} "
+            f"vectorized_ms={current * 1e3:.2f} speedup={legacy / current:.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
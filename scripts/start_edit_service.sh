@@ -14,6 +14,12 @@ export EDIT_MAX_CONCURRENCY="${EDIT_MAX_CONCURRENCY:-1}"
 export EDIT_MAX_QUEUE="${EDIT_MAX_QUEUE:-16}"
 export EDIT_INFER_TIMEOUT_SEC="${EDIT_INFER_TIMEOUT_SEC:-600}"
 export EDIT_CACHE_DIR="${EDIT_CACHE_DIR:-outputs/service_cache/edit}"
+export EDIT_ENCODER_PROFILE="${EDIT_ENCODER_PROFILE:-staging_fast}"
+export EDIT_ROI_ENABLED="${EDIT_ROI_ENABLED:-true}"
+export EDIT_ROI_MARGIN="${EDIT_ROI_MARGIN:-32}"
+export EDIT_ROI_MIN_SIZE="${EDIT_ROI_MIN_SIZE:-256}"
+export EDIT_RESOLUTION_TIERS="${EDIT_RESOLUTION_TIERS:-1024,896,768,640,512}"
+export EDIT_TIER_PROBE_EVERY="${EDIT_TIER_PROBE_EVERY:-16}"
 
 conda run -n "${CONDA_ENV}" \
   python -m uvicorn services.edit_service.app:app \
@@ -14,6 +14,7 @@ export LAYERED_MAX_CONCURRENCY="${LAYERED_MAX_CONCURRENCY:-1}"
 export LAYERED_MAX_QUEUE="${LAYERED_MAX_QUEUE:-16}"
 export LAYERED_INFER_TIMEOUT_SEC="${LAYERED_INFER_TIMEOUT_SEC:-300}"
 export LAYERED_CACHE_DIR="${LAYERED_CACHE_DIR:-outputs/service_cache/layered}"
+export LAYERED_ENCODER_PROFILE="${LAYERED_ENCODER_PROFILE:-staging_fast}"
 
 conda run -n "${CONDA_ENV}" \
   python -m uvicorn services.layered_service.app:app \
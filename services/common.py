@@ -11,6 +11,8 @@ from typing import Any, TypeVar
 import anyio
 from fastapi import HTTPException
 
+from image_edit_dataset_factory.core.config import DEFAULT_ENCODER_PROFILES, EncoderProfile
+
 T = TypeVar("T")
 LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +45,14 @@ def env_str(name: str, default: str) -> str:
     return raw
 
 
+def env_encoder_profile(name: str, default: str = "staging_fast") -> EncoderProfile:
+    profile_name = env_str(name, default).strip()
+    if profile_name not in DEFAULT_ENCODER_PROFILES:
+        msg = f"{name} must be one of {sorted(DEFAULT_ENCODER_PROFILES)}, got: {profile_name}"
+        raise RuntimeError(msg)
+    return EncoderProfile.model_validate(DEFAULT_ENCODER_PROFILES[profile_name])
+
+
 @dataclass
 class ServiceRuntime:
     cache_dir: Path
@@ -6,7 +6,6 @@ from typing import Any
 
 import numpy as np
 from fastapi import FastAPI, HTTPException
-from PIL import Image
 
 from image_edit_dataset_factory.backends.mock_backend import MockEditorBackend
 from image_edit_dataset_factory.backends.opencv_fallback import OpenCVFallbackBackend
@@ -19,13 +18,15 @@ from image_edit_dataset_factory.clients.serialization import (
     decode_rgb_png_base64,
     encode_rgb_png_base64,
 )
-from image_edit_dataset_factory.utils.image_io import read_image_rgb, read_mask
+from image_edit_dataset_factory.core.config import ResolutionTierConfig, RoiInpaintConfig
+from image_edit_dataset_factory.utils.image_io import read_image_rgb, read_mask, write_image_rgb
 from image_edit_dataset_factory.utils.mask_ops import mask_from_bbox
 from services.common import (
     BackendState,
     RequestLimiter,
     ServiceRuntime,
     env_bool,
+    env_encoder_profile,
     env_float,
     env_int,
     env_str,
@@ -47,13 +48,33 @@ class EditServiceSettings(ServiceRuntime):
         self.backend = env_str("EDIT_BACKEND", "mock").strip().lower()
         self.model_dir = env_str("EDIT_MODEL_DIR", "Qwen/Qwen-Image-Edit")
         self.device = env_str("EDIT_DEVICE", "cuda")
+        # Cache files are scratch artefacts, so favour encode speed over size.
+        self.encoder = env_encoder_profile("EDIT_ENCODER_PROFILE")
+        self.roi = RoiInpaintConfig(
+            enabled=env_bool("EDIT_ROI_ENABLED", True),
+            margin=env_int("EDIT_ROI_MARGIN", 32),
+            min_size=env_int("EDIT_ROI_MIN_SIZE", 256),
+        )
+        self.tiers = ResolutionTierConfig(
+            tiers=[
+                int(item)
+                for item in env_str("EDIT_RESOLUTION_TIERS", "1024,896,768,640,512").split(",")
+                if item.strip()
+            ],
+            probe_every=env_int("EDIT_TIER_PROBE_EVERY", 16),
+        )
 
 
 def _build_backend(settings: EditServiceSettings) -> Any:
     if settings.backend == "qwen":
-        return QwenImageEditModelScopeBackend(model_dir=settings.model_dir, device=settings.device)
+        return QwenImageEditModelScopeBackend(
+            model_dir=settings.model_dir,
+            device=settings.device,
+            roi=settings.roi,
+            tiers=settings.tiers,
+        )
     if settings.backend == "opencv":
-        return OpenCVFallbackBackend()
+        return OpenCVFallbackBackend(roi=settings.roi)
     if settings.backend == "mock":
         return MockEditorBackend()
     raise RuntimeError(f"unsupported edit backend: {settings.backend}")
@@ -104,6 +125,9 @@ def create_app(settings: EditServiceSettings | None = None) -> FastAPI:
             "ready": state.is_ready(),
             "backend": cfg.backend,
             "last_error": state.last_error,
+            "tier_stats": (
+                state.backend.tier_stats() if hasattr(state.backend, "tier_stats") else None
+            ),
         }
 
     @app.post("/infer", response_model=EditInferResponse)
@@ -121,7 +145,7 @@ def create_app(settings: EditServiceSettings | None = None) -> FastAPI:
             if req.save_cache:
                 cache_dir.mkdir(parents=True, exist_ok=True)
                 output_file = cache_dir / "result.png"
-                Image.fromarray(result.astype(np.uint8), mode="RGB").save(output_file)
+                write_image_rgb(output_file, result, profile=cfg.encoder)
                 result_path = str(output_file)
 
             runtime = infer_runtime_name(backend, default=cfg.backend)
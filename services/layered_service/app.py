@@ -22,12 +22,14 @@ from image_edit_dataset_factory.clients.serialization import (
     encode_mask_png_base64,
     encode_rgba_png_base64,
 )
-from image_edit_dataset_factory.utils.image_io import read_image_rgb
+from image_edit_dataset_factory.core.config import EncoderProfile
+from image_edit_dataset_factory.utils.image_io import read_image_rgb, write_mask
 from services.common import (
     BackendState,
     RequestLimiter,
     ServiceRuntime,
     env_bool,
+    env_encoder_profile,
     env_float,
     env_int,
     env_str,
@@ -49,6 +51,8 @@ class LayeredServiceSettings(ServiceRuntime):
         self.backend = env_str("LAYERED_BACKEND", "mock").strip().lower()
         self.model_dir = env_str("LAYERED_MODEL_DIR", "qwen/Qwen-Image-Layered")
         self.device = env_str("LAYERED_DEVICE", "cuda")
+        # Cache files are scratch artefacts, so favour encode speed over size.
+        self.encoder = env_encoder_profile("LAYERED_ENCODER_PROFILE")
 
 
 def _build_backend(settings: LayeredServiceSettings) -> Any:
@@ -59,9 +63,11 @@ def _build_backend(settings: LayeredServiceSettings) -> Any:
     raise RuntimeError(f"unsupported layered backend: {settings.backend}")
 
 
-def _save_rgba(path: Path, rgba: np.ndarray) -> None:
+def _save_rgba(path: Path, rgba: np.ndarray, profile: EncoderProfile) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    Image.fromarray(rgba.astype(np.uint8), mode="RGBA").save(path)
+    Image.fromarray(rgba.astype(np.uint8), mode="RGBA").save(
+        path, compress_level=profile.png_compress_level
+    )
 
 
 def _build_input_image(req: LayeredInferRequest) -> np.ndarray:
@@ -120,8 +126,8 @@ def create_app(settings: LayeredServiceSettings | None = None) -> FastAPI:
                 if req.save_cache:
                     rgba_file = cache_dir / f"layer_{layer.layer_id:02d}.png"
                     alpha_file = cache_dir / f"layer_{layer.layer_id:02d}_alpha.png"
-                    _save_rgba(rgba_file, layer.rgba)
-                    Image.fromarray(layer.alpha.astype(np.uint8), mode="L").save(alpha_file)
+                    _save_rgba(rgba_file, layer.rgba, cfg.encoder)
+                    write_mask(alpha_file, layer.alpha, cfg.encoder)
                     rgba_path = str(rgba_file)
                     alpha_path = str(alpha_file)
 
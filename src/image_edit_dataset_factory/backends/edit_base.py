@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
 
 import numpy as np
 
+from image_edit_dataset_factory.core.config import RoiInpaintConfig
+from image_edit_dataset_factory.utils.mask_ops import roi_bbox
+
 
 class EditorBackend(ABC):
     @abstractmethod
@@ -14,3 +18,39 @@ class EditorBackend(ABC):
 
     def edit(self, image_rgb: np.ndarray, mask: np.ndarray, prompt: str) -> np.ndarray:
         return self.inpaint(image_rgb=image_rgb, mask=mask, prompt=prompt)
+
+    def inpaint_batch(
+        self,
+        images_rgb: Sequence[np.ndarray],
+        masks: Sequence[np.ndarray],
+        prompt: str | None = None,
+    ) -> list[np.ndarray]:
+        """Inpaint several images with one prompt; backends that batch natively override this."""
+        return [
+            self.inpaint(image, mask, prompt=prompt)
+            for image, mask in zip(images_rgb, masks, strict=True)
+        ]
+
+
+def inpaint_in_roi(
+    image_rgb: np.ndarray,
+    mask: np.ndarray,
+    roi: RoiInpaintConfig | None,
+    inpaint_fn: Callable[[np.ndarray, np.ndarray], np.ndarray],
+) -> np.ndarray:
+    """Runs `inpaint_fn` on the mask bbox plus context and pastes the crop back."""
+    if roi is None or not roi.enabled:
+        return inpaint_fn(image_rgb, mask)
+    bbox = roi_bbox(mask, margin=roi.margin, min_size=roi.min_size)
+    if bbox is None:
+        return image_rgb.copy()
+    x0, y0, x1, y1 = bbox
+    h, w = image_rgb.shape[:2]
+    if (x1 - x0) * (y1 - y0) >= h * w:
+        return inpaint_fn(image_rgb, mask)
+
+    out = image_rgb.copy()
+    out[y0:y1, x0:x1] = inpaint_fn(
+        np.ascontiguousarray(image_rgb[y0:y1, x0:x1]), np.ascontiguousarray(mask[y0:y1, x0:x1])
+    )
+    return out
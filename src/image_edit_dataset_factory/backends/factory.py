@@ -47,10 +47,12 @@ def build_edit_backend(cfg: AppConfig) -> EditorBackend:
             fallback = MockEditorBackend()
         return ApiEditorBackend(endpoint_cfg=cfg.services.edit, fallback=fallback)
     if key == "opencv":
-        return OpenCVFallbackBackend()
+        return OpenCVFallbackBackend(roi=cfg.backends.roi)
     if key == "qwen":
         return QwenImageEditModelScopeBackend(
             model_dir=cfg.modelscope.qwen_edit_model_dir,
             device=cfg.backends.device,
+            roi=cfg.backends.roi,
+            tiers=cfg.backends.resolution_tiers,
         )
     raise ValueError(f"Unsupported edit backend: {cfg.backends.edit_backend}")
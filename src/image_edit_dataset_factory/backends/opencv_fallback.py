@@ -3,17 +3,45 @@ from __future__ import annotations
 import cv2
 import numpy as np
 
-from image_edit_dataset_factory.backends.edit_base import EditorBackend
+from image_edit_dataset_factory.backends.edit_base import EditorBackend, inpaint_in_roi
+from image_edit_dataset_factory.core.config import RoiInpaintConfig
+from image_edit_dataset_factory.utils.tiling import DEFAULT_TILE_SIZE, fits_one_tile, iter_tiles
 
 
 class OpenCVFallbackBackend(EditorBackend):
-    def __init__(self, radius: float = 3.0, method: int = cv2.INPAINT_TELEA) -> None:
+    def __init__(
+        self,
+        radius: float = 3.0,
+        method: int = cv2.INPAINT_TELEA,
+        roi: RoiInpaintConfig | None = None,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        tile_halo: int = 64,
+    ) -> None:
         self.radius = radius
         self.method = method
+        self.roi = roi
+        self.tile_size = tile_size
+        self.tile_halo = tile_halo
 
     def inpaint(
         self, image_rgb: np.ndarray, mask: np.ndarray, prompt: str | None = None
     ) -> np.ndarray:
+        return inpaint_in_roi(image_rgb, mask, self.roi, self._inpaint_full)
+
+    def _inpaint_full(self, image_rgb: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        if fits_one_tile(image_rgb.shape, self.tile_size):
+            return self._inpaint_block(image_rgb, mask)
+        # Holes wider than the halo are filled from the tile's own context only, so this is
+        # an approximation of the full-frame result; tiles without mask pixels are skipped.
+        out = image_rgb.copy()
+        for tile in iter_tiles(image_rgb.shape, self.tile_size, self.tile_halo):
+            if not np.any(mask[tile.core]):
+                continue
+            block = self._inpaint_block(image_rgb[tile.padded], mask[tile.padded])
+            out[tile.core] = block[tile.inner]
+        return out
+
+    def _inpaint_block(self, image_rgb: np.ndarray, mask: np.ndarray) -> np.ndarray:
         image_bgr = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2BGR)
         inpainted = cv2.inpaint(image_bgr, (mask > 0).astype(np.uint8), self.radius, self.method)
         return cv2.cvtColor(inpainted, cv2.COLOR_BGR2RGB)
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+import time
 from typing import Any
 
 import numpy as np
 
-from image_edit_dataset_factory.backends.edit_base import EditorBackend
+from image_edit_dataset_factory.backends.edit_base import EditorBackend, inpaint_in_roi
 from image_edit_dataset_factory.backends.modelscope_utils import (
     pil_to_rgb_array,
     resolve_local_model_dir,
     to_pil,
 )
+from image_edit_dataset_factory.backends.resolution_tiers import ResolutionTierController
+from image_edit_dataset_factory.core.config import ResolutionTierConfig, RoiInpaintConfig
 
 
 class QwenImageEditModelScopeBackend(EditorBackend):
@@ -24,9 +27,19 @@ class QwenImageEditModelScopeBackend(EditorBackend):
 
     MODEL_ID = "Qwen/Qwen-Image-Edit"
 
-    def __init__(self, model_dir: str | None, device: str = "cpu") -> None:
+    def __init__(
+        self,
+        model_dir: str | None,
+        device: str = "cpu",
+        roi: RoiInpaintConfig | None = None,
+        tiers: ResolutionTierConfig | None = None,
+    ) -> None:
         self.model_dir = model_dir
         self.device = device
+        # Cropping to the mask keeps small objects at a higher effective resolution.
+        self.roi = roi
+        # Remembers which max_side fits per input size so OOM retries are not paid every call.
+        self.tiers = ResolutionTierController.from_config(tiers or ResolutionTierConfig())
         self._pipeline: Any | None = None
         self._runtime: str | None = None
 
@@ -76,9 +89,7 @@ class QwenImageEditModelScopeBackend(EditorBackend):
             from diffusers import DiffusionPipeline
 
             torch_dtype = (
-                torch.bfloat16
-                if self.device.lower().startswith("cuda")
-                else torch.float32
+                torch.bfloat16 if self.device.lower().startswith("cuda") else torch.float32
             )
             pipe = DiffusionPipeline.from_pretrained(
                 str(local_dir),
@@ -185,9 +196,17 @@ class QwenImageEditModelScopeBackend(EditorBackend):
 
         return None
 
+    def tier_stats(self) -> dict[int, dict[str, float | int]]:
+        return self.tiers.stats()
+
     def inpaint(
         self, image_rgb: np.ndarray, mask: np.ndarray, prompt: str | None = None
     ) -> np.ndarray:
+        return inpaint_in_roi(
+            image_rgb, mask, self.roi, lambda image, crop_mask: self._edit(image, crop_mask, prompt)
+        )
+
+    def _edit(self, image_rgb: np.ndarray, mask: np.ndarray, prompt: str | None) -> np.ndarray:
         self._lazy_init()
 
         import torch
@@ -195,11 +214,9 @@ class QwenImageEditModelScopeBackend(EditorBackend):
 
         text = prompt or "remove object and naturally repair the background"
         original_h, original_w = image_rgb.shape[:2]
-        max_side_candidates = [1024, 896, 768, 640, 512]
-        max_side_candidates = sorted(set(max_side_candidates), reverse=True)
 
         all_errors: list[str] = []
-        for max_side in max_side_candidates:
+        for max_side in self.tiers.plan(image_rgb.shape):
             resized_image, resized_mask = self._resize_image_and_mask(
                 image_rgb=image_rgb,
                 mask=mask,
@@ -228,13 +245,20 @@ class QwenImageEditModelScopeBackend(EditorBackend):
 
             per_scale_errors: list[str] = []
             for fn in attempts:
+                started = time.perf_counter()
                 try:
                     with torch.inference_mode():
                         output = fn()
                     result = self._extract_output_image(output)
                     if result is None:
+                        self.tiers.record(
+                            image_rgb.shape, max_side, False, time.perf_counter() - started
+                        )
                         per_scale_errors.append("pipeline returned no valid output image")
                         continue
+                    self.tiers.record(
+                        image_rgb.shape, max_side, True, time.perf_counter() - started
+                    )
 
                     if result.shape[:2] != resized_image.shape[:2]:
                         result = np.asarray(
@@ -248,9 +272,13 @@ class QwenImageEditModelScopeBackend(EditorBackend):
                     # Localize edit result with mask to emulate inpaint behavior.
                     mask_f = (resized_mask.astype(np.float32) / 255.0)[..., None]
                     blended = (
-                        result.astype(np.float32) * mask_f
-                        + resized_image.astype(np.float32) * (1.0 - mask_f)
-                    ).clip(0, 255).astype(np.uint8)
+                        (
+                            result.astype(np.float32) * mask_f
+                            + resized_image.astype(np.float32) * (1.0 - mask_f)
+                        )
+                        .clip(0, 255)
+                        .astype(np.uint8)
+                    )
 
                     if blended.shape[:2] != (original_h, original_w):
                         result = np.asarray(
@@ -263,6 +291,9 @@ class QwenImageEditModelScopeBackend(EditorBackend):
                         result = blended
                     return result
                 except Exception as exc:  # pragma: no cover
+                    self.tiers.record(
+                        image_rgb.shape, max_side, False, time.perf_counter() - started
+                    )
                     if self._is_cuda_oom(exc):
                         torch.cuda.empty_cache()
                     per_scale_errors.append(str(exc))
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from image_edit_dataset_factory.core.config import ResolutionTierConfig
+
+
+@dataclass
+class TierStats:
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    total_latency_sec: float = 0.0
+
+    def as_dict(self) -> dict[str, float | int]:
+        mean = self.total_latency_sec / self.attempts if self.attempts else 0.0
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "mean_latency_sec": round(mean, 4),
+        }
+
+
+class ResolutionTierController:
+    """Remembers the largest max_side tier that worked per input-size bucket.
+
+    Requests start at the remembered tier and walk down from there. Every
+    `probe_every`-th request in a bucket starts one tier higher, so a device that
+    has freed memory (or a transient OOM) does not pin the bucket low forever.
+    """
+
+    def __init__(self, tiers: Sequence[int], probe_every: int = 16, bucket_px: int = 256) -> None:
+        self.tiers = sorted(set(tiers), reverse=True)
+        self.probe_every = probe_every
+        self.bucket_px = bucket_px
+        self._best: dict[int, int] = {}
+        self._requests: dict[int, int] = {}
+        self._stats: dict[int, TierStats] = {tier: TierStats() for tier in self.tiers}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg: ResolutionTierConfig) -> ResolutionTierController:
+        return cls(cfg.tiers, probe_every=cfg.probe_every, bucket_px=cfg.bucket_px)
+
+    def bucket(self, shape: tuple[int, ...]) -> int:
+        longest = max(shape[:2])
+        return -(-longest // self.bucket_px) * self.bucket_px
+
+    def plan(self, shape: tuple[int, ...]) -> list[int]:
+        key = self.bucket(shape)
+        with self._lock:
+            count = self._requests.get(key, 0) + 1
+            self._requests[key] = count
+            best = self._best.get(key)
+        if best is None:
+            return list(self.tiers)
+        start = self.tiers.index(best)
+        if start > 0 and self.probe_every > 0 and count % self.probe_every == 0:
+            start -= 1
+        return self.tiers[start:]
+
+    def record(self, shape: tuple[int, ...], tier: int, success: bool, latency_sec: float) -> None:
+        key = self.bucket(shape)
+        with self._lock:
+            stats = self._stats.setdefault(tier, TierStats())
+            stats.attempts += 1
+            stats.total_latency_sec += latency_sec
+            if success:
+                stats.successes += 1
+                # The tier that just worked becomes the start point, whether it came from
+                # an upward probe or a fallback after a failure.
+                self._best[key] = tier
+            else:
+                stats.failures += 1
+
+    def best_tier(self, shape: tuple[int, ...]) -> int | None:
+        with self._lock:
+            return self._best.get(self.bucket(shape))
+
+    def stats(self) -> dict[int, dict[str, float | int]]:
+        with self._lock:
+            return {tier: stats.as_dict() for tier, stats in self._stats.items()}
@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import Any
 
 import yaml
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from image_edit_dataset_factory.core.enums import DEFAULT_CATEGORY_TO_TASK
 
@@ -43,11 +43,35 @@ class ModelScopeConfig(BaseModel):
     qwen_edit_model_dir: str | None = "Qwen/Qwen-Image-Edit"
 
 
+class RoiInpaintConfig(BaseModel):
+    # Inpaint only the mask bbox plus context instead of the full frame.
+    enabled: bool = True
+    margin: int = 32
+    min_size: int = 256
+
+
+class ResolutionTierConfig(BaseModel):
+    # max_side tiers tried by the Qwen edit backend, largest first.
+    tiers: list[int] = [1024, 896, 768, 640, 512]
+    probe_every: int = 16
+    bucket_px: int = 256
+
+    @field_validator("tiers")
+    @classmethod
+    def _validate_tiers(cls, value: list[int]) -> list[int]:
+        if not value or any(tier < 64 for tier in value):
+            msg = "resolution tiers must be non-empty and >= 64"
+            raise ValueError(msg)
+        return sorted(set(value), reverse=True)
+
+
 class BackendConfig(BaseModel):
     layered_backend: str = "mock"
     edit_backend: str = "opencv"
     use_modelscope: bool = False
     device: str = "cpu"
+    roi: RoiInpaintConfig = RoiInpaintConfig()
+    resolution_tiers: ResolutionTierConfig = ResolutionTierConfig()
 
 
 class ServiceEndpointConfig(BaseModel):
@@ -82,8 +106,115 @@ class ServicesConfig(BaseModel):
     )
 
 
+DECOMPOSE_EXECUTORS = ("auto", "serial", "process", "thread", "gpu")
+
+
+class DecomposeConfig(BaseModel):
+    layer_format: str = "png"
+    executor: str = "auto"
+    num_workers: int = 4
+    prefetch: int = 2
+    io_workers: int = 2
+
+    @field_validator("layer_format")
+    @classmethod
+    def _validate_layer_format(cls, value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in {"png", "npz"}:
+            msg = f"layer_format must be one of png/npz, got: {value}"
+            raise ValueError(msg)
+        return normalized
+
+    @field_validator("executor")
+    @classmethod
+    def _validate_executor(cls, value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in DECOMPOSE_EXECUTORS:
+            msg = f"executor must be one of {'/'.join(DECOMPOSE_EXECUTORS)}, got: {value}"
+            raise ValueError(msg)
+        return normalized
+
+
+class EncoderProfile(BaseModel):
+    jpeg_quality: int = 95
+    jpeg_optimize: bool = True
+    jpeg_progressive: bool = False
+    # PIL subsampling: 0 = 4:4:4, 1 = 4:2:2, 2 = 4:2:0; None keeps the encoder default.
+    jpeg_subsampling: int | None = None
+    png_compress_level: int = 6
+
+
+DEFAULT_ENCODER_PROFILES = {
+    "staging_fast": {"jpeg_optimize": False, "png_compress_level": 1},
+    "final_archive": {"jpeg_optimize": True, "png_compress_level": 9},
+}
+
+
+class EncodingConfig(BaseModel):
+    profiles: dict[str, EncoderProfile] = Field(
+        default_factory=lambda: {
+            name: EncoderProfile.model_validate(values)
+            for name, values in DEFAULT_ENCODER_PROFILES.items()
+        }
+    )
+    staging: str = "staging_fast"
+    export: str = "final_archive"
+
+    @model_validator(mode="after")
+    def _validate_profile_names(self) -> EncodingConfig:
+        for field_name in ("staging", "export"):
+            name = getattr(self, field_name)
+            if name not in self.profiles:
+                msg = f"encoding.{field_name} must name one of {sorted(self.profiles)}, got: {name}"
+                raise ValueError(msg)
+        return self
+
+    @property
+    def staging_profile(self) -> EncoderProfile:
+        return self.profiles[self.staging]
+
+    @property
+    def export_profile(self) -> EncoderProfile:
+        return self.profiles[self.export]
+
+
+class StructuralVariantConfig(BaseModel):
+    # Paste offset as a fraction of image width/height; scale resizes the ROI about its centre.
+    dx: float = 0.06
+    dy: float = 0.03
+    scale: float = 1.0
+
+    @field_validator("scale")
+    @classmethod
+    def _validate_scale(cls, value: float) -> float:
+        if value <= 0:
+            msg = f"scale must be positive, got: {value}"
+            raise ValueError(msg)
+        return value
+
+
 class GenerateConfig(BaseModel):
     dry_run: bool = False
+    prefetch: int = 2
+    io_workers: int = 2
+    # Same-task inpaint jobs handed to EditorBackend.inpaint_batch at once.
+    batch_size: int = 1
+    # Tasks mapped above 1 run generate() on that many threads, one generator per thread.
+    workers_per_task: dict[str, int] = Field(default_factory=lambda: {"consistency_edit": 4})
+    # Records per source. Each task takes this many entries from its variant list below;
+    # decode, masks and backend outputs are computed once and shared by the variants.
+    variants_per_source: int = 1
+    semantic_prompts: list[str] = Field(default_factory=lambda: ["delete object"])
+    structural_variants: list[StructuralVariantConfig] = Field(
+        default_factory=lambda: [
+            StructuralVariantConfig(dx=0.06, dy=0.03),
+            StructuralVariantConfig(dx=-0.06, dy=0.03),
+            StructuralVariantConfig(dx=0.0, dy=0.0, scale=1.25),
+            StructuralVariantConfig(dx=0.06, dy=-0.03, scale=0.8),
+        ]
+    )
+    # Red-up/blue-down colour shift strengths, see color_lut.color_tone_table.
+    consistency_warmth: list[float] = Field(default_factory=lambda: [0.03, -0.03, 0.06, -0.06])
     category_to_task: dict[str, str] = Field(default_factory=lambda: dict(DEFAULT_CATEGORY_TO_TASK))
     subtypes: dict[str, str] = Field(
         default_factory=lambda: {
@@ -93,12 +224,68 @@ class GenerateConfig(BaseModel):
         }
     )
 
+    @field_validator("semantic_prompts", "structural_variants", "consistency_warmth")
+    @classmethod
+    def _validate_variant_options(cls, value: list[object]) -> list[object]:
+        if not value:
+            msg = "variant option lists must not be empty"
+            raise ValueError(msg)
+        return value
+
+
+EXPORT_TRANSFERS = ("transcode", "auto", "hardlink", "copy")
+EXPORT_LAYOUTS = ("tree", "shards")
+
+
+class ExportConfig(BaseModel):
+    # "transcode" decodes and re-encodes every artefact with the export profile. The other
+    # modes place staged bytes as-is when they already satisfy the naming spec (upright RGB
+    # JPEG, 1-bit PNG mask) via utils.file_ops.materialize, and transcode the rest.
+    transfer: str = "transcode"
+    # Threads running per-sample copy/encode/text writes; export is I/O-latency bound on NFS.
+    workers: int = 8
+    # Zero-padded digits per sample id. 5 is the delivery naming spec; raise it for >99999.
+    id_width: int = 5
+    # "tree" writes <task>/<subtype>/<scene>/<id>* files; "shards" writes WebDataset-style
+    # tars under dataset/shards with an offset index, bounded by the two limits below.
+    layout: str = "tree"
+    shard_max_bytes: int = 1 << 30
+    shard_max_samples: int = 10000
+
+    @field_validator("transfer")
+    @classmethod
+    def _validate_transfer(cls, value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in EXPORT_TRANSFERS:
+            msg = f"transfer must be one of {'/'.join(EXPORT_TRANSFERS)}, got: {value}"
+            raise ValueError(msg)
+        return normalized
+
+    @field_validator("layout")
+    @classmethod
+    def _validate_layout(cls, value: str) -> str:
+        normalized = value.strip().lower()
+        if normalized not in EXPORT_LAYOUTS:
+            msg = f"layout must be one of {'/'.join(EXPORT_LAYOUTS)}, got: {value}"
+            raise ValueError(msg)
+        return normalized
+
+    @field_validator("workers", "id_width", "shard_max_bytes", "shard_max_samples")
+    @classmethod
+    def _validate_positive(cls, value: int) -> int:
+        if value < 1:
+            msg = f"value must be >= 1, got: {value}"
+            raise ValueError(msg)
+        return value
+
 
 class QAConfig(BaseModel):
     allowed_region_dilation_px: int = 7
     max_mse_outside_region: float = 4.0
     min_ssim_outside_region: float = 0.98
     max_changed_pixel_ratio_outside_region: float = 0.02
+    # Scene directories linted concurrently; each image is decoded once.
+    lint_workers: int = 8
 
 
 class PipelineConfig(BaseModel):
@@ -108,6 +295,9 @@ class PipelineConfig(BaseModel):
     export: bool = True
     qa: bool = True
     resume: bool = False
+    # Run generate -> export -> QA per sample with arrays passed in memory instead of
+    # round-tripping through staged files. Needs all three stages enabled.
+    streaming: bool = False
 
 
 class AppConfig(BaseModel):
@@ -117,7 +307,10 @@ class AppConfig(BaseModel):
     backends: BackendConfig = BackendConfig()
     modelscope: ModelScopeConfig = ModelScopeConfig()
     services: ServicesConfig = ServicesConfig()
+    decompose: DecomposeConfig = DecomposeConfig()
     generate: GenerateConfig = GenerateConfig()
+    encoding: EncodingConfig = EncodingConfig()
+    export: ExportConfig = ExportConfig()
     qa: QAConfig = QAConfig()
     pipeline: PipelineConfig = PipelineConfig()
     json_logs: bool = True
@@ -28,6 +28,7 @@ class DecomposeRecord(BaseModel):
     image_path: str
     mask_path: str
     layer_paths: list[str] = Field(default_factory=list)
+    layer_store_path: str | None = None
     metadata: dict[str, Any] = Field(default_factory=dict)
 
 
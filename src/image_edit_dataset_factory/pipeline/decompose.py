@@ -1,39 +1,135 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
+from functools import partial
 from pathlib import Path
 
 import numpy as np
 
 from image_edit_dataset_factory.backends.factory import build_layered_backend
-from image_edit_dataset_factory.core.config import AppConfig
+from image_edit_dataset_factory.backends.layered_base import LayeredDecomposer, LayerOutput
+from image_edit_dataset_factory.core.config import AppConfig, EncoderProfile
 from image_edit_dataset_factory.core.paths import resolve_paths
 from image_edit_dataset_factory.core.schema import DecomposeRecord, SourceSample
-from image_edit_dataset_factory.utils.image_io import read_image_rgb, write_image_rgb, write_mask
+from image_edit_dataset_factory.pipeline.decompose_executor import DecomposeExecutor
+from image_edit_dataset_factory.utils.image_io import LazyImage, write_image_rgb, write_mask
 from image_edit_dataset_factory.utils.jsonl import read_jsonl, write_jsonl
+from image_edit_dataset_factory.utils.layer_store import LayerStore, write_layer_store
+from image_edit_dataset_factory.utils.mask_io import write_binary_mask
 from image_edit_dataset_factory.utils.mask_ops import alpha_to_mask, mask_from_bbox, refine_mask
 
 LOGGER = logging.getLogger(__name__)
 
 
-def _select_primary_mask(image_rgb: np.ndarray, alphas: list[np.ndarray]) -> np.ndarray:
+PRIMARY_MASK_MIN_RATIO = 0.01
+PRIMARY_MASK_MAX_RATIO = 0.9
+
+
+def _layer_coverage(alphas: Sequence[np.ndarray], total: int) -> np.ndarray:
+    # A flat count_nonzero per layer is much cheaper than np.stack + count_nonzero(axis=...).
+    counts = [np.count_nonzero(alpha[:, :, 0] if alpha.ndim == 3 else alpha) for alpha in alphas]
+    return np.asarray(counts, dtype=np.float64) / float(total)
+
+
+def _select_primary_mask(shape: tuple[int, ...], alphas: Sequence[np.ndarray]) -> np.ndarray:
+    h, w = shape[:2]
     if alphas:
-        candidates: list[tuple[float, np.ndarray]] = []
-        total = image_rgb.shape[0] * image_rgb.shape[1]
-        for alpha in alphas:
-            mask = refine_mask(alpha_to_mask(alpha), kernel_size=3, iterations=1)
-            ratio = float((mask > 0).sum() / total)
-            candidates.append((ratio, mask))
-
-        candidates = [item for item in candidates if 0.01 <= item[0] <= 0.9]
-        if candidates:
-            candidates.sort(key=lambda x: x[0])
-            return candidates[0][1]
-
-    h, w = image_rgb.shape[:2]
+        ratios = _layer_coverage(alphas, h * w)
+        in_band = np.flatnonzero(
+            (ratios >= PRIMARY_MASK_MIN_RATIO) & (ratios <= PRIMARY_MASK_MAX_RATIO)
+        )
+        # Smallest in-band layer wins; refinement only runs on the chosen candidate.
+        for idx in in_band[np.argsort(ratios[in_band], kind="stable")]:
+            mask = refine_mask(alpha_to_mask(alphas[idx]), kernel_size=3, iterations=1)
+            if np.any(mask):
+                return mask
+
     return mask_from_bbox((h, w), (w // 4, h // 4, (3 * w) // 4, (3 * h) // 4))
 
 
+def _load_source(source: SourceSample, decode: bool) -> LazyImage:
+    image = LazyImage(source.image_path, width=source.width, height=source.height)
+    if decode:
+        _ = image.array
+    return image
+
+
+def _infer_layers(
+    backend: LayeredDecomposer, source: SourceSample, image: LazyImage, from_path: bool
+) -> list[LayerOutput]:
+    if from_path:
+        return backend.decompose_from_path(source.image_path, sample_id=source.source_id)
+    return backend.decompose(image.array)
+
+
+def _write_outputs(
+    source: SourceSample,
+    image: LazyImage,
+    layers: list[LayerOutput],
+    out_dir: Path,
+    layer_format: str,
+    encoder: EncoderProfile,
+) -> dict[str, object]:
+    source_dir = out_dir / source.source_id
+    source_dir.mkdir(parents=True, exist_ok=True)
+
+    alpha_list = [layer.alpha for layer in layers]
+    layer_paths: list[str] = []
+    layer_store_path: str | None = None
+    if layer_format == "npz":
+        layer_store_path = str(write_layer_store(source_dir / "layers.npz", layers))
+    else:
+        for idx, layer in enumerate(layers):
+            rgba_path = source_dir / f"layer_{idx:02d}.png"
+            alpha_path = source_dir / f"layer_{idx:02d}_alpha.png"
+            write_image_rgb(rgba_path, layer.rgba[:, :, :3], profile=encoder)
+            write_mask(alpha_path, layer.alpha, encoder)
+            layer_paths.append(str(rgba_path))
+
+    return _finalize_record(
+        source, image.shape, alpha_list, source_dir, layer_paths, layer_store_path, encoder
+    )
+
+
+def _finalize_record(
+    source: SourceSample,
+    shape: tuple[int, ...],
+    alphas: Sequence[np.ndarray],
+    source_dir: Path,
+    layer_paths: list[str],
+    layer_store_path: str | None,
+    encoder: EncoderProfile,
+) -> dict[str, object]:
+    mask = _select_primary_mask(shape, alphas)
+    mask_path = source_dir / "primary_mask.png"
+    write_binary_mask(mask_path, mask, encoder)
+
+    record = DecomposeRecord(
+        source_id=source.source_id,
+        image_path=source.image_path,
+        mask_path=str(mask_path),
+        layer_paths=layer_paths,
+        layer_store_path=layer_store_path,
+        metadata={"dataset_category": source.dataset_category},
+    )
+    return record.model_dump(mode="json")
+
+
+def _resume_from_store(
+    source: SourceSample, out_dir: Path, encoder: EncoderProfile
+) -> dict[str, object] | None:
+    # Reuses layers already stored by a previous run and only re-selects the primary mask.
+    source_dir = out_dir / source.source_id
+    store_path = source_dir / "layers.npz"
+    if not store_path.exists():
+        return None
+    with LayerStore(store_path) as store:
+        alphas = store.alphas()
+        shape = store.shape
+    return _finalize_record(source, shape, alphas, source_dir, [], str(store_path), encoder)
+
+
 def run_decompose(cfg: AppConfig) -> Path:
     paths = resolve_paths(cfg)
     paths.ensure_runtime_dirs()
@@ -45,39 +141,36 @@ def run_decompose(cfg: AppConfig) -> Path:
     out_dir = paths.cache_dir / "decompose"
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    records: list[dict[str, object]] = []
-    for source in rows:
-        image = read_image_rgb(source.image_path)
-        if hasattr(backend, "decompose_from_path"):
-            layers = backend.decompose_from_path(source.image_path, sample_id=source.source_id)
-        else:
-            layers = backend.decompose(image)
-
-        source_dir = out_dir / source.source_id
-        source_dir.mkdir(parents=True, exist_ok=True)
-
-        alpha_list: list[np.ndarray] = []
-        layer_paths: list[str] = []
-        for idx, layer in enumerate(layers):
-            rgba_path = source_dir / f"layer_{idx:02d}.png"
-            alpha_path = source_dir / f"layer_{idx:02d}_alpha.png"
-            write_image_rgb(rgba_path, layer.rgba[:, :, :3])
-            write_mask(alpha_path, layer.alpha)
-            alpha_list.append(layer.alpha)
-            layer_paths.append(str(rgba_path))
-
-        mask = _select_primary_mask(image, alpha_list)
-        mask_path = source_dir / "primary_mask.png"
-        write_mask(mask_path, mask)
-
-        record = DecomposeRecord(
-            source_id=source.source_id,
-            image_path=source.image_path,
-            mask_path=str(mask_path),
-            layer_paths=layer_paths,
-            metadata={"dataset_category": source.dataset_category},
-        )
-        records.append(record.model_dump(mode="json"))
+    encoder = cfg.encoding.staging_profile
+    records: list[dict[str, object] | None] = [None] * len(rows)
+    if cfg.pipeline.resume and cfg.decompose.layer_format == "npz":
+        for idx, source in enumerate(rows):
+            records[idx] = _resume_from_store(source, out_dir, encoder)
+    pending = [idx for idx, record in enumerate(records) if record is None]
+    if len(pending) < len(rows):
+        LOGGER.info("decompose_resume reused=%s", len(rows) - len(pending))
+
+    from_path = hasattr(backend, "decompose_from_path")
+    executor = DecomposeExecutor(
+        backend,
+        policy=cfg.decompose.executor,
+        num_workers=cfg.decompose.num_workers,
+        prefetch=cfg.decompose.prefetch,
+        io_workers=cfg.decompose.io_workers,
+    )
+    fresh = executor.run(
+        [rows[idx] for idx in pending],
+        load=partial(_load_source, decode=not from_path),
+        infer=partial(_infer_layers, from_path=from_path),
+        write=partial(
+            _write_outputs,
+            out_dir=out_dir,
+            layer_format=cfg.decompose.layer_format,
+            encoder=encoder,
+        ),
+    )
+    for idx, record in zip(pending, fresh, strict=True):
+        records[idx] = record
 
     manifest_path = paths.manifests_dir / "decompose_manifest.jsonl"
     write_jsonl(manifest_path, records)
@@ -1,26 +1,38 @@
 from __future__ import annotations
 
-import csv
 import json
 import logging
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
-from image_edit_dataset_factory.core.config import AppConfig
+import numpy as np
+
+from image_edit_dataset_factory.core.config import AppConfig, EncoderProfile
 from image_edit_dataset_factory.core.paths import resolve_paths
 from image_edit_dataset_factory.core.schema import SampleRecord
+from image_edit_dataset_factory.pipeline.index_writer import IndexSink, load_id_map
+from image_edit_dataset_factory.pipeline.shard_export import SHARD_DIR_NAME, export_shards
+from image_edit_dataset_factory.utils.file_ops import materialize
+from image_edit_dataset_factory.utils.id_allocator import IdAllocator
 from image_edit_dataset_factory.utils.image_io import (
+    is_upright_rgb_jpeg,
     read_image_rgb,
-    read_mask,
     write_image_rgb,
-    write_mask,
 )
-from image_edit_dataset_factory.utils.mask_ops import ensure_binary, invert_mask
+from image_edit_dataset_factory.utils.mask_io import (
+    MASK_CACHE,
+    is_binary_png,
+    read_binary_mask,
+    write_binary_mask,
+)
 from image_edit_dataset_factory.utils.naming import (
     format_sample_id,
     instruction_ch_name,
     instruction_en_name,
     mask_name,
+    next_id_from_dataset_root,
     result_image_name,
     source_image_name,
 )
@@ -29,114 +41,183 @@ from image_edit_dataset_factory.utils.text_ops import write_utf8_text
 LOGGER = logging.getLogger(__name__)
 
 
-def _write_index(samples: list[SampleRecord], reports_dir: Path) -> tuple[Path, Path]:
-    csv_path = reports_dir / "index.csv"
-    jsonl_path = reports_dir / "index.jsonl"
-
-    with csv_path.open("w", encoding="utf-8", newline="") as handle:
-        writer = csv.writer(handle)
-        writer.writerow(
-            [
-                "sample_id",
-                "dataset_category",
-                "edit_task",
-                "subtype",
-                "scene",
-                "source_id",
-                "src_image_path",
-                "result_image_path",
-                "mask_paths",
-                "instruction_ch",
-                "instruction_en",
-                "metadata",
-            ]
-        )
-        for sample in samples:
-            writer.writerow(
-                [
-                    sample.sample_id,
-                    sample.dataset_category,
-                    sample.edit_task,
-                    sample.subtype,
-                    sample.scene,
-                    sample.source_id,
-                    sample.src_image_path,
-                    sample.result_image_path,
-                    "|".join(sample.mask_paths),
-                    sample.instruction_ch,
-                    sample.instruction_en,
-                    json.dumps(sample.metadata, ensure_ascii=False),
-                ]
-            )
-
-    with jsonl_path.open("w", encoding="utf-8") as handle:
-        for sample in samples:
-            handle.write(json.dumps(sample.model_dump(mode="json"), ensure_ascii=False) + "\n")
-
-    return csv_path, jsonl_path
-
-
-def run_export(cfg: AppConfig) -> Path:
-    paths = resolve_paths(cfg)
-    paths.ensure_runtime_dirs()
-
-    generated_manifest = paths.manifests_dir / "generated_manifest.jsonl"
+ID_COUNTER_NAME = "id_counter"
+
+
+@dataclass
+class SampleArrays:
+    """Decoded artefacts of one sample, handed over in memory by the streaming pipeline."""
+
+    source: np.ndarray
+    result: np.ndarray
+    mask: np.ndarray | None
+
+
+def _export_image(path: str, out: Path, encoder: EncoderProfile, transfer: str) -> None:
+    if transfer != "transcode" and is_upright_rgb_jpeg(path):
+        method = materialize(path, out, transfer)
+    else:
+        write_image_rgb(out, read_image_rgb(path), profile=encoder)
+        method = "encode"
+    LOGGER.debug("export_artifact path=%s method=%s", out, method)
+
+
+def _export_mask(path: str, out: Path, encoder: EncoderProfile, transfer: str) -> None:
+    if transfer != "transcode" and is_binary_png(path):
+        method = materialize(path, out, transfer)
+    else:
+        write_binary_mask(out, read_binary_mask(path), encoder)
+        method = "encode"
+    LOGGER.debug("export_artifact path=%s method=%s", out, method)
+
+
+def export_sample(
+    sample: SampleRecord,
+    sid: str,
+    dataset_dir: Path,
+    encoder: EncoderProfile,
+    arrays: SampleArrays | None = None,
+    transfer: str = "transcode",
+) -> SampleRecord:
+    scene_dir = dataset_dir / sample.edit_task.value / sample.subtype / sample.scene
+    scene_dir.mkdir(parents=True, exist_ok=True)
+
+    src_out = scene_dir / source_image_name(sid)
+    result_out = scene_dir / result_image_name(sid)
+    ch_out = scene_dir / instruction_ch_name(sid)
+    en_out = scene_dir / instruction_en_name(sid)
+    mask0_out = scene_dir / mask_name(sid)
+    mask1_out = scene_dir / mask_name(sid, index=1)
+
+    write_utf8_text(ch_out, sample.instruction_ch)
+    write_utf8_text(en_out, sample.instruction_en)
+    out_masks: list[str] = []
+
+    if arrays is not None:
+        # In-memory samples come straight from a generator, whose mask-1 is always the inverse.
+        write_image_rgb(src_out, arrays.source, profile=encoder)
+        write_image_rgb(result_out, arrays.result, profile=encoder)
+        if arrays.mask is not None:
+            write_binary_mask(mask0_out, arrays.mask, encoder)
+            write_binary_mask(mask1_out, MASK_CACHE.inverted(arrays.mask), encoder)
+            out_masks = [str(mask0_out), str(mask1_out)]
+    else:
+        _export_image(sample.src_image_path, src_out, encoder, transfer)
+        _export_image(sample.result_image_path, result_out, encoder, transfer)
+        if sample.mask_paths:
+            _export_mask(sample.mask_paths[0], mask0_out, encoder, transfer)
+            if len(sample.mask_paths) > 1:
+                _export_mask(sample.mask_paths[1], mask1_out, encoder, transfer)
+            else:
+                inverted = MASK_CACHE.inverted(read_binary_mask(sample.mask_paths[0]))
+                write_binary_mask(mask1_out, inverted, encoder)
+            out_masks = [str(mask0_out), str(mask1_out)]
+
+    return sample.model_copy(
+        update={
+            "sample_id": sid,
+            "src_image_path": str(src_out),
+            "result_image_path": str(result_out),
+            "mask_paths": out_masks,
+        }
+    )
+
+
+def load_generated(cfg: AppConfig) -> list[SampleRecord]:
+    generated_manifest = resolve_paths(cfg).manifests_dir / "generated_manifest.jsonl"
     rows = [
         json.loads(line)
         for line in generated_manifest.read_text(encoding="utf-8").splitlines()
         if line.strip()
     ]
-    generated = [SampleRecord.model_validate(item) for item in rows]
+    return [SampleRecord.model_validate(item) for item in rows]
+
+
+def id_allocator(cfg: AppConfig) -> IdAllocator:
+    return IdAllocator(resolve_paths(cfg).reports_dir / ID_COUNTER_NAME)
+
 
-    if not cfg.pipeline.resume and paths.dataset_dir.exists():
+def reset_dataset_dir(cfg: AppConfig) -> None:
+    if cfg.pipeline.resume:
+        return
+    paths = resolve_paths(cfg)
+    id_allocator(cfg).reset()
+    if paths.dataset_dir.exists():
         shutil.rmtree(paths.dataset_dir)
         paths.dataset_dir.mkdir(parents=True, exist_ok=True)
 
-    exported: list[SampleRecord] = []
-    next_idx = 1
-    for sample in generated:
-        sid = format_sample_id(next_idx)
-        next_idx += 1
 
-        scene_dir = paths.dataset_dir / sample.edit_task.value / sample.subtype / sample.scene
-        scene_dir.mkdir(parents=True, exist_ok=True)
+def _seed_export_id(dataset_dir: Path, id_map: dict[str, str], width: int) -> int:
+    # Only runs when the id counter is missing, i.e. datasets exported before it existed.
+    if id_map:
+        return max(int(sid) for sid in id_map.values()) + 1
+    next_idx = next_id_from_dataset_root(dataset_dir, width)
+    if next_idx > 1:
+        LOGGER.warning("export_no_id_map dataset=%s next_id=%s", dataset_dir, next_idx)
+    return next_idx
 
-        src_out = scene_dir / source_image_name(sid)
-        result_out = scene_dir / result_image_name(sid)
-        ch_out = scene_dir / instruction_ch_name(sid)
-        en_out = scene_dir / instruction_en_name(sid)
 
-        write_image_rgb(src_out, read_image_rgb(sample.src_image_path))
-        write_image_rgb(result_out, read_image_rgb(sample.result_image_path))
-        write_utf8_text(ch_out, sample.instruction_ch)
-        write_utf8_text(en_out, sample.instruction_en)
+def run_export(cfg: AppConfig) -> Path:
+    paths = resolve_paths(cfg)
+    paths.ensure_runtime_dirs()
 
-        out_masks: list[str] = []
-        if sample.mask_paths:
-            mask0 = ensure_binary(read_mask(sample.mask_paths[0]))
-            mask0_out = scene_dir / mask_name(sid)
-            write_mask(mask0_out, mask0)
-            out_masks.append(str(mask0_out))
+    generated = load_generated(cfg)
+    reset_dataset_dir(cfg)
+
+    # With resume on, samples whose generation key already has an id are left untouched and
+    # new ones continue the numbering, so the dataset and index only ever grow.
+    id_map = load_id_map(paths.reports_dir) if cfg.pipeline.resume else {}
+    pending = [sample for sample in generated if sample.sample_id not in id_map]
+    width = cfg.export.id_width
+    next_idx = id_allocator(cfg).reserve(
+        len(pending), initial=lambda: _seed_export_id(paths.dataset_dir, id_map, width)
+    )
+    append = next_idx > 1
+
+    encoder = cfg.encoding.export_profile
+    # Ids follow manifest order and are fixed before any I/O, so the output does not depend
+    # on which worker finishes first; pool.map also hands results back in that order.
+    jobs = [
+        (sample, format_sample_id(idx, width)) for idx, sample in enumerate(pending, start=next_idx)
+    ]
 
-            mask1_out = scene_dir / mask_name(sid, index=1)
-            if len(sample.mask_paths) > 1:
-                mask1 = ensure_binary(read_mask(sample.mask_paths[1]))
-            else:
-                mask1 = invert_mask(mask0)
-            write_mask(mask1_out, mask1)
-            out_masks.append(str(mask1_out))
-
-        exported.append(
-            sample.model_copy(
-                update={
-                    "sample_id": sid,
-                    "src_image_path": str(src_out),
-                    "result_image_path": str(result_out),
-                    "mask_paths": out_masks,
-                }
-            )
+    def _export(job: tuple[SampleRecord, str]) -> SampleRecord:
+        return export_sample(
+            job[0], job[1], paths.dataset_dir, encoder, transfer=cfg.export.transfer
         )
 
-    _, index_jsonl = _write_index(exported, paths.reports_dir)
-    LOGGER.info("export_done count=%s index=%s", len(exported), index_jsonl)
+    workers = min(cfg.export.workers, max(1, len(jobs)))
+    LOGGER.info(
+        "export_start count=%s skipped=%s first_id=%s workers=%s layout=%s",
+        len(jobs),
+        len(generated) - len(jobs),
+        next_idx,
+        workers,
+        cfg.export.layout,
+    )
+    # Index rows are streamed to temp files as samples finish, in id order, and only
+    # replace the live index once every sample is on disk.
+    sink = IndexSink(paths.reports_dir, append=append)
+    try:
+        if cfg.export.layout == "shards":
+            exported = export_shards(
+                jobs,
+                paths.dataset_dir / SHARD_DIR_NAME,
+                encoder,
+                cfg.export.transfer,
+                cfg.export.shard_max_bytes,
+                cfg.export.shard_max_samples,
+                workers,
+            )
+            for (sample, _), record in zip(jobs, exported, strict=True):
+                sink.write(record, key=sample.sample_id)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as pool:
+                for (sample, _), record in zip(jobs, pool.map(_export, jobs), strict=True):
+                    sink.write(record, key=sample.sample_id)
+    except BaseException:
+        sink.abort()
+        raise
+    _, index_jsonl = sink.commit()
+    LOGGER.info("export_done count=%s index=%s", sink.count, index_jsonl)
     return index_jsonl
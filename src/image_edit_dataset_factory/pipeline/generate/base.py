@@ -1,12 +1,35 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Protocol, TypeVar
+
+import numpy as np
 
 from image_edit_dataset_factory.backends.edit_base import EditorBackend
-from image_edit_dataset_factory.core.config import AppConfig
+from image_edit_dataset_factory.core.config import AppConfig, EncoderProfile
 from image_edit_dataset_factory.core.schema import DecomposeRecord, SampleRecord, SourceSample
+from image_edit_dataset_factory.utils.image_io import write_image_rgb
+from image_edit_dataset_factory.utils.mask_io import write_binary_mask
+
+T = TypeVar("T")
+
+
+class SampleSink(Protocol):
+    """Receives finished variants in memory instead of having them written to staging."""
+
+    def plan(self, variant_counts: list[tuple[str, int]]) -> None: ...
+
+    def emit(
+        self,
+        prepared: PreparedSample,
+        variant: int,
+        record: SampleRecord,
+        edited: np.ndarray,
+        allowed: np.ndarray | None,
+    ) -> SampleRecord: ...
 
 
 @dataclass
@@ -14,17 +37,158 @@ class GenerationContext:
     cfg: AppConfig
     staging_dir: Path
     edit_backend: EditorBackend
+    sink: SampleSink | None = None
+
+
+@dataclass
+class PreparedSample:
+    source: SourceSample
+    image: np.ndarray
+    mask: np.ndarray
+    out_dir: Path
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def src_path(self) -> Path:
+        return self.out_dir / "source.jpg"
+
+    @property
+    def result_path(self) -> Path:
+        return self.out_dir / "result.jpg"
+
+    @property
+    def mask_path(self) -> Path:
+        return self.out_dir / "mask.png"
+
+    @property
+    def allowed_path(self) -> Path:
+        return self.out_dir / "allowed_mask.png"
+
+    # Variant 0 keeps the single-sample file names, so one-variant runs are unchanged.
+    def variant_result_path(self, variant: int) -> Path:
+        return self.result_path if variant == 0 else self.out_dir / f"result_v{variant}.jpg"
+
+    def variant_allowed_path(self, variant: int) -> Path:
+        if variant == 0:
+            return self.allowed_path
+        return self.out_dir / f"allowed_mask_v{variant}.png"
+
+    def variant_sample_id(self, variant: int) -> str:
+        source_id = self.source.source_id
+        return source_id if variant == 0 else f"{source_id}_v{variant}"
 
 
 class BaseGenerator(ABC):
+    """Generators are split into I/O-bound `prepare`/`finalize` and model-bound `infer`
+    so the staged runner can overlap decode/encode with model calls.
+
+    One source yields up to `generate.variants_per_source` records. `prepare` decodes and
+    derives masks once, `infer` returns the edited images the variants share, and
+    `finalize` turns them into one record per variant."""
+
     edit_task: str
+    # False for generators that never call the edit backend; they run on CPU workers
+    # alongside the backend-bound tasks.
+    uses_backend: bool = True
 
     def __init__(self, context: GenerationContext) -> None:
         self.context = context
+        self.encoder: EncoderProfile = context.cfg.encoding.staging_profile
+
+    def variant_params(self, options: Sequence[T]) -> list[T]:
+        return list(options[: max(1, self.context.cfg.generate.variants_per_source)])
+
+    def variant_count(self) -> int:
+        return 1
+
+    def emit(
+        self,
+        prepared: PreparedSample,
+        variant: int,
+        record: SampleRecord,
+        edited: np.ndarray,
+        allowed: np.ndarray | None = None,
+    ) -> SampleRecord:
+        """Write a finished variant to staging, or hand it to the context's sink.
+
+        `allowed` is the variant's own allowed-region mask; None means the shared one
+        already written by `prepare`.
+        """
+        sink = self.context.sink
+        if sink is not None:
+            return sink.emit(prepared, variant, record, edited, allowed)
+        write_image_rgb(prepared.variant_result_path(variant), edited, profile=self.encoder)
+        if allowed is not None:
+            write_binary_mask(prepared.variant_allowed_path(variant), allowed, self.encoder)
+        return record
 
-    @abstractmethod
     def generate(
         self,
         source: SourceSample,
         decompose: DecomposeRecord,
-    ) -> SampleRecord: ...
+    ) -> list[SampleRecord]:
+        prepared = self.prepare(source, decompose)
+        return self.finalize(prepared, self.infer(prepared))
+
+    @abstractmethod
+    def prepare(self, source: SourceSample, decompose: DecomposeRecord) -> PreparedSample: ...
+
+    @abstractmethod
+    def infer(self, prepared: PreparedSample) -> list[np.ndarray]: ...
+
+    def infer_batch(self, batch: list[PreparedSample]) -> list[list[np.ndarray]]:
+        return [self.infer(prepared) for prepared in batch]
+
+    @abstractmethod
+    def finalize(
+        self, prepared: PreparedSample, edited: list[np.ndarray]
+    ) -> list[SampleRecord]: ...
+
+
+class InpaintGenerator(BaseGenerator):
+    """Generators whose model step is an inpaint of `prepared.mask`, once per prompt."""
+
+    prompt: str
+
+    def prompts(self) -> list[str]:
+        return [self.prompt]
+
+    def variant_count(self) -> int:
+        return len(self.prompts())
+
+    def skip_inpaint(self, prepared: PreparedSample) -> bool:
+        return self.context.cfg.generate.dry_run
+
+    def infer(self, prepared: PreparedSample) -> list[np.ndarray]:
+        return self.infer_batch([prepared])[0]
+
+    def infer_batch(self, batch: list[PreparedSample]) -> list[list[np.ndarray]]:
+        per_prompt = [self._inpaint_batch(batch, prompt) for prompt in self.prompts()]
+        return [list(images) for images in zip(*per_prompt, strict=True)]
+
+    def _inpaint_batch(self, batch: list[PreparedSample], prompt: str) -> list[np.ndarray]:
+        backend = self.context.edit_backend
+        results: list[np.ndarray | None] = [None] * len(batch)
+        pending: list[int] = []
+        for idx, prepared in enumerate(batch):
+            if self.skip_inpaint(prepared):
+                results[idx] = prepared.image.copy()
+            elif hasattr(backend, "inpaint_from_path"):
+                results[idx] = backend.inpaint_from_path(
+                    image_path=prepared.src_path,
+                    mask_path=prepared.mask_path,
+                    prompt=prompt,
+                    sample_id=prepared.source.source_id,
+                )
+            else:
+                pending.append(idx)
+
+        if pending:
+            edited = backend.inpaint_batch(
+                [batch[idx].image for idx in pending],
+                [batch[idx].mask for idx in pending],
+                prompt=prompt,
+            )
+            for idx, image in zip(pending, edited, strict=True):
+                results[idx] = image
+        return [image for image in results if image is not None]
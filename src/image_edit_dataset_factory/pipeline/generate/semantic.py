@@ -1,65 +1,71 @@
 from __future__ import annotations
 
+import numpy as np
+
 from image_edit_dataset_factory.core.enums import EditTask
 from image_edit_dataset_factory.core.schema import DecomposeRecord, SampleRecord, SourceSample
-from image_edit_dataset_factory.pipeline.generate.base import BaseGenerator
+from image_edit_dataset_factory.pipeline.generate.base import InpaintGenerator, PreparedSample
 from image_edit_dataset_factory.utils.image_io import (
     read_image_rgb,
-    read_mask,
-    write_image_rgb,
-    write_mask,
+    stage_source_image,
 )
-from image_edit_dataset_factory.utils.mask_ops import dilate_mask, ensure_binary, invert_mask
+from image_edit_dataset_factory.utils.mask_io import MASK_CACHE, read_binary_mask, write_binary_mask
 
 
-class SemanticGenerator(BaseGenerator):
+class SemanticGenerator(InpaintGenerator):
     edit_task = EditTask.SEMANTIC.value
+    prompt = "delete object"
 
-    def generate(self, source: SourceSample, decompose: DecomposeRecord) -> SampleRecord:
+    def prepare(self, source: SourceSample, decompose: DecomposeRecord) -> PreparedSample:
         image = read_image_rgb(source.image_path)
-        mask = ensure_binary(read_mask(decompose.mask_path))
+        mask = read_binary_mask(decompose.mask_path)
 
         out_dir = self.context.staging_dir / self.edit_task / source.source_id
         out_dir.mkdir(parents=True, exist_ok=True)
-
-        src_path = out_dir / "source.jpg"
-        result_path = out_dir / "result.jpg"
-        mask_path = out_dir / "mask.png"
+        prepared = PreparedSample(source=source, image=image, mask=mask, out_dir=out_dir)
         mask1_path = out_dir / "mask-1.png"
-        allowed_path = out_dir / "allowed_mask.png"
+        prepared.extra["mask1_path"] = mask1_path
 
-        write_image_rgb(src_path, image)
-        write_mask(mask_path, mask)
-        write_mask(mask1_path, invert_mask(mask))
-        write_mask(
-            allowed_path, dilate_mask(mask, pixels=self.context.cfg.qa.allowed_region_dilation_px)
+        stage_source_image(source.image_path, prepared.src_path, image, self.encoder)
+        write_binary_mask(prepared.mask_path, mask, self.encoder)
+        write_binary_mask(mask1_path, MASK_CACHE.inverted(mask), self.encoder)
+        write_binary_mask(
+            prepared.allowed_path,
+            MASK_CACHE.dilated(mask, self.context.cfg.qa.allowed_region_dilation_px),
+            self.encoder,
         )
+        return prepared
+
+    def prompts(self) -> list[str]:
+        return self.variant_params(self.context.cfg.generate.semantic_prompts)
 
-        if self.context.cfg.generate.dry_run:
-            edited = image.copy()
-        else:
-            if hasattr(self.context.edit_backend, "inpaint_from_path"):
-                edited = self.context.edit_backend.inpaint_from_path(
-                    image_path=src_path,
-                    mask_path=mask_path,
-                    prompt="delete object",
-                    sample_id=source.source_id,
-                )
-            else:
-                edited = self.context.edit_backend.inpaint(image, mask, prompt="delete object")
-        write_image_rgb(result_path, edited)
+    def finalize(self, prepared: PreparedSample, edited: list[np.ndarray]) -> list[SampleRecord]:
+        # Variants differ only by prompt; source, masks and allowed region are shared.
+        return [
+            self._record(prepared, variant, image, prompt)
+            for variant, (image, prompt) in enumerate(zip(edited, self.prompts(), strict=True))
+        ]
 
-        return SampleRecord(
-            sample_id=source.source_id,
+    def _record(
+        self, prepared: PreparedSample, variant: int, edited: np.ndarray, prompt: str
+    ) -> SampleRecord:
+        source = prepared.source
+        record = SampleRecord(
+            sample_id=prepared.variant_sample_id(variant),
             dataset_category=source.dataset_category,
             edit_task=EditTask.SEMANTIC,
             subtype=self.context.cfg.generate.subtypes.get(self.edit_task, "delete"),
             scene=source.scene,
             source_id=source.source_id,
-            src_image_path=str(src_path),
-            result_image_path=str(result_path),
-            mask_paths=[str(mask_path), str(mask1_path)],
+            src_image_path=str(prepared.src_path),
+            result_image_path=str(prepared.variant_result_path(variant)),
+            mask_paths=[str(prepared.mask_path), str(prepared.extra["mask1_path"])],
             instruction_ch="删除目标并修复背景",
             instruction_en="Delete the target object and repair background",
-            metadata={"allowed_region_mask_path": str(allowed_path)},
+            metadata={
+                "allowed_region_mask_path": str(prepared.allowed_path),
+                "variant": variant,
+                "prompt": prompt,
+            },
         )
+        return self.emit(prepared, variant, record, edited)
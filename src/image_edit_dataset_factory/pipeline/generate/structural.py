@@ -1,96 +1,142 @@
 from __future__ import annotations
 
+import math
+
+import cv2
 import numpy as np
 
+from image_edit_dataset_factory.core.config import StructuralVariantConfig
 from image_edit_dataset_factory.core.enums import EditTask
 from image_edit_dataset_factory.core.schema import DecomposeRecord, SampleRecord, SourceSample
-from image_edit_dataset_factory.pipeline.generate.base import BaseGenerator
+from image_edit_dataset_factory.pipeline.generate.base import InpaintGenerator, PreparedSample
 from image_edit_dataset_factory.utils.image_io import (
     read_image_rgb,
-    read_mask,
-    write_image_rgb,
-    write_mask,
+    stage_source_image,
 )
-from image_edit_dataset_factory.utils.mask_ops import bbox_from_mask, dilate_mask, ensure_binary
+from image_edit_dataset_factory.utils.mask_io import MASK_CACHE, read_binary_mask, write_binary_mask
+from image_edit_dataset_factory.utils.mask_ops import bbox_from_mask, dilate_mask
 
 
-class StructuralGenerator(BaseGenerator):
+class StructuralGenerator(InpaintGenerator):
     edit_task = EditTask.STRUCTURAL.value
+    # Inpaint old location
+    prompt = "repair hole"
 
-    def generate(self, source: SourceSample, decompose: DecomposeRecord) -> SampleRecord:
+    def prepare(self, source: SourceSample, decompose: DecomposeRecord) -> PreparedSample:
         image = read_image_rgb(source.image_path)
-        mask = ensure_binary(read_mask(decompose.mask_path))
-        bbox = bbox_from_mask(mask)
+        mask = read_binary_mask(decompose.mask_path)
 
         out_dir = self.context.staging_dir / self.edit_task / source.source_id
         out_dir.mkdir(parents=True, exist_ok=True)
-        src_path = out_dir / "source.jpg"
-        result_path = out_dir / "result.jpg"
-        mask_path = out_dir / "mask.png"
-        allowed_path = out_dir / "allowed_mask.png"
+        prepared = PreparedSample(source=source, image=image, mask=mask, out_dir=out_dir)
+        prepared.extra["bbox"] = bbox_from_mask(mask)
 
-        write_image_rgb(src_path, image)
-        write_mask(mask_path, mask)
+        stage_source_image(source.image_path, prepared.src_path, image, self.encoder)
+        write_binary_mask(prepared.mask_path, mask, self.encoder)
+        return prepared
 
-        allowed_base = mask.copy()
+    def skip_inpaint(self, prepared: PreparedSample) -> bool:
+        return prepared.extra["bbox"] is None or super().skip_inpaint(prepared)
 
-        if bbox is None or self.context.cfg.generate.dry_run:
-            edited = image.copy()
-        else:
-            x0, y0, x1, y1 = bbox
-            roi = image[y0 : y1 + 1, x0 : x1 + 1]
-            roi_mask = mask[y0 : y1 + 1, x0 : x1 + 1]
-
-            # Inpaint old location
-            if hasattr(self.context.edit_backend, "inpaint_from_path"):
-                base = self.context.edit_backend.inpaint_from_path(
-                    image_path=src_path,
-                    mask_path=mask_path,
-                    prompt="repair hole",
-                    sample_id=source.source_id,
-                )
-            else:
-                base = self.context.edit_backend.inpaint(image, mask, prompt="repair hole")
-
-            # Move region slightly to simulate structural edit
-            dx = max(5, int(image.shape[1] * 0.06))
-            dy = max(5, int(image.shape[0] * 0.03))
-            nx0 = min(max(0, x0 + dx), image.shape[1] - 1)
-            ny0 = min(max(0, y0 + dy), image.shape[0] - 1)
-            nx1 = min(image.shape[1], nx0 + roi.shape[1])
-            ny1 = min(image.shape[0], ny0 + roi.shape[0])
-
-            edited = base.copy()
-            paste_roi = roi[: ny1 - ny0, : nx1 - nx0]
-            paste_mask = roi_mask[: ny1 - ny0, : nx1 - nx0] > 0
-            view = edited[ny0:ny1, nx0:nx1]
-            view[paste_mask] = paste_roi[paste_mask]
-
-            moved_mask = np.zeros_like(mask)
-            moved_view = moved_mask[ny0:ny1, nx0:nx1]
-            moved_view[paste_mask] = 255
-            allowed_base = np.maximum(mask, moved_mask)
-
-        write_image_rgb(result_path, edited)
-        write_mask(
-            allowed_path,
-            dilate_mask(
-                allowed_base,
-                pixels=self.context.cfg.qa.allowed_region_dilation_px,
-            ),
+    def variant_count(self) -> int:
+        return len(self.variant_params(self.context.cfg.generate.structural_variants))
+
+    def finalize(self, prepared: PreparedSample, edited: list[np.ndarray]) -> list[SampleRecord]:
+        # One inpainted background serves every move/scale variant; only the ROI paste and
+        # the allowed-mask composition are redone per variant.
+        (base,) = edited
+        variants = self.variant_params(self.context.cfg.generate.structural_variants)
+        return [self._record(prepared, idx, base, variant) for idx, variant in enumerate(variants)]
+
+    @staticmethod
+    def _offset_px(fraction: float, size: int) -> int:
+        if fraction == 0:
+            return 0
+        return int(math.copysign(max(5, abs(int(size * fraction))), fraction))
+
+    @staticmethod
+    def _scaled_roi(
+        roi: np.ndarray, roi_mask: np.ndarray, scale: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if scale == 1.0:
+            return roi, roi_mask
+        size = (max(1, round(roi.shape[1] * scale)), max(1, round(roi.shape[0] * scale)))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        return (
+            cv2.resize(roi, size, interpolation=interpolation),
+            cv2.resize(roi_mask, size, interpolation=cv2.INTER_NEAREST),
+        )
+
+    def _paste(
+        self, prepared: PreparedSample, base: np.ndarray, variant: StructuralVariantConfig
+    ) -> tuple[np.ndarray, np.ndarray]:
+        image = prepared.image
+        mask = prepared.mask
+        h, w = image.shape[:2]
+        x0, y0, x1, y1 = prepared.extra["bbox"]
+        roi, roi_mask = self._scaled_roi(
+            image[y0 : y1 + 1, x0 : x1 + 1], mask[y0 : y1 + 1, x0 : x1 + 1], variant.scale
         )
 
-        return SampleRecord(
-            sample_id=source.source_id,
+        # Move (and rescale about its centre) the region to simulate a structural edit.
+        dx = self._offset_px(variant.dx, w) - (roi.shape[1] - (x1 + 1 - x0)) // 2
+        dy = self._offset_px(variant.dy, h) - (roi.shape[0] - (y1 + 1 - y0)) // 2
+        nx0 = min(max(0, x0 + dx), w - 1)
+        ny0 = min(max(0, y0 + dy), h - 1)
+        nx1 = min(w, nx0 + roi.shape[1])
+        ny1 = min(h, ny0 + roi.shape[0])
+
+        edited = base.copy()
+        paste_roi = roi[: ny1 - ny0, : nx1 - nx0]
+        paste_mask = roi_mask[: ny1 - ny0, : nx1 - nx0] > 0
+        view = edited[ny0:ny1, nx0:nx1]
+        view[paste_mask] = paste_roi[paste_mask]
+
+        # dilate(mask | moved) == dilate(mask) | dilate(moved): the source-mask half is cached
+        # and shared by all variants, the moved half is dilated only around the paste window.
+        pad = self.context.cfg.qa.allowed_region_dilation_px
+        allowed = MASK_CACHE.dilated(mask, pad).copy()
+        wy0, wy1 = max(0, ny0 - pad), min(h, ny1 + pad)
+        wx0, wx1 = max(0, nx0 - pad), min(w, nx1 + pad)
+        moved = np.zeros((wy1 - wy0, wx1 - wx0), dtype=np.uint8)
+        moved[ny0 - wy0 : ny1 - wy0, nx0 - wx0 : nx1 - wx0][paste_mask] = 255
+        window = allowed[wy0:wy1, wx0:wx1]
+        np.maximum(window, dilate_mask(moved, pixels=pad), out=window)
+        return edited, allowed
+
+    def _record(
+        self,
+        prepared: PreparedSample,
+        idx: int,
+        base: np.ndarray,
+        variant: StructuralVariantConfig,
+    ) -> SampleRecord:
+        source = prepared.source
+        if prepared.extra["bbox"] is not None and not self.context.cfg.generate.dry_run:
+            edited, allowed = self._paste(prepared, base, variant)
+        else:
+            edited = base
+            allowed = MASK_CACHE.dilated(
+                prepared.mask, self.context.cfg.qa.allowed_region_dilation_px
+            )
+
+        subtype = self.context.cfg.generate.subtypes.get(self.edit_task, "move")
+        record = SampleRecord(
+            sample_id=prepared.variant_sample_id(idx),
             dataset_category=source.dataset_category,
             edit_task=EditTask.STRUCTURAL,
-            subtype=self.context.cfg.generate.subtypes.get(self.edit_task, "move"),
+            subtype="scale" if variant.scale != 1.0 else subtype,
             scene=source.scene,
             source_id=source.source_id,
-            src_image_path=str(src_path),
-            result_image_path=str(result_path),
-            mask_paths=[str(mask_path)],
+            src_image_path=str(prepared.src_path),
+            result_image_path=str(prepared.variant_result_path(idx)),
+            mask_paths=[str(prepared.mask_path)],
             instruction_ch="调整目标结构位置并修复背景",
             instruction_en="Move or scale the target structure and repair background",
-            metadata={"allowed_region_mask_path": str(allowed_path)},
+            metadata={
+                "allowed_region_mask_path": str(prepared.variant_allowed_path(idx)),
+                "variant": idx,
+                **variant.model_dump(),
+            },
         )
+        return self.emit(prepared, idx, record, edited, allowed)
@@ -4,6 +4,7 @@ import numpy as np
 
 from image_edit_dataset_factory.core.schema import SampleModel, SourceMetadata
 from image_edit_dataset_factory.pipeline.generate.base import GenerationContext, SampleGenerator
+from image_edit_dataset_factory.utils.color_lut import StyleChain, apply_luts, style_table
 from image_edit_dataset_factory.utils.image_io import read_image_rgb, write_image_rgb, write_mask
 
 
@@ -14,33 +15,18 @@ class StyleGenerator(SampleGenerator):
         super().__init__(context)
         self.subtypes = context.cfg.generate.categories.get(self.category)
 
-    @staticmethod
-    def _apply_contrast(image: np.ndarray, factor: float = 1.25) -> np.ndarray:
-        centered = image.astype(np.float32) - 127.5
-        out = centered * factor + 127.5
-        return np.clip(out, 0, 255).astype(np.uint8)
-
-    @staticmethod
-    def _apply_brightness(image: np.ndarray, delta: int = 20) -> np.ndarray:
-        out = image.astype(np.int16) + delta
-        return np.clip(out, 0, 255).astype(np.uint8)
-
-    @staticmethod
-    def _apply_color_tone(image: np.ndarray) -> np.ndarray:
-        out = image.astype(np.float32).copy()
-        out[:, :, 0] *= 1.08
-        out[:, :, 1] *= 1.00
-        out[:, :, 2] *= 0.92
-        return np.clip(out, 0, 255).astype(np.uint8)
+    # Legacy default amount per subtype; each maps to one cached cv2.LUT table.
+    DEFAULT_CHAINS: dict[str, StyleChain] = {
+        "contrast": (("contrast", 1.25),),
+        "brightness": (("brightness", 20),),
+        "color_tone": (("color_tone", 0.08),),
+    }
 
     def _transform(self, subtype: str, image: np.ndarray) -> np.ndarray:
-        if subtype == "contrast":
-            return self._apply_contrast(image)
-        if subtype == "brightness":
-            return self._apply_brightness(image)
-        if subtype == "color_tone":
-            return self._apply_color_tone(image)
-        return image
+        chain = self.DEFAULT_CHAINS.get(subtype)
+        if chain is None:
+            return image
+        return apply_luts(image, style_table(chain))
 
     def generate_for_source(
         self,
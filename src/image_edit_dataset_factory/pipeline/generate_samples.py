@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from image_edit_dataset_factory.backends.factory import build_edit_backend
@@ -8,11 +10,16 @@ from image_edit_dataset_factory.core.config import AppConfig
 from image_edit_dataset_factory.core.enums import EditTask
 from image_edit_dataset_factory.core.paths import resolve_paths
 from image_edit_dataset_factory.core.schema import DecomposeRecord, SampleRecord, SourceSample
-from image_edit_dataset_factory.pipeline.generate.base import BaseGenerator, GenerationContext
+from image_edit_dataset_factory.pipeline.generate.base import (
+    BaseGenerator,
+    GenerationContext,
+    SampleSink,
+)
 from image_edit_dataset_factory.pipeline.generate.consistency import ConsistencyGenerator
 from image_edit_dataset_factory.pipeline.generate.semantic import SemanticGenerator
 from image_edit_dataset_factory.pipeline.generate.structural import StructuralGenerator
 from image_edit_dataset_factory.utils.jsonl import read_jsonl, write_jsonl
+from image_edit_dataset_factory.utils.stage_pipeline import run_staged
 
 LOGGER = logging.getLogger(__name__)
 
@@ -24,7 +31,58 @@ GENERATOR_MAP: dict[str, type[BaseGenerator]] = {
 }
 
 
-def run_generate(cfg: AppConfig) -> Path:
+def _generate_staged(
+    generator: BaseGenerator,
+    jobs: list[tuple[int, SourceSample, DecomposeRecord]],
+    cfg: AppConfig,
+) -> list[list[SampleRecord]]:
+    # Decode/encode run on I/O threads; backend calls stay on this thread, one batch at a
+    # time, and every batch shares the task's prompt.
+    size = max(1, cfg.generate.batch_size)
+    batches = [jobs[start : start + size] for start in range(0, len(jobs), size)]
+    staged = run_staged(
+        batches,
+        load=lambda batch: [generator.prepare(job[1], job[2]) for job in batch],
+        infer=lambda batch, prepared: generator.infer_batch(prepared),
+        write=lambda batch, prepared, edited: [
+            generator.finalize(item, images) for item, images in zip(prepared, edited, strict=True)
+        ],
+        io_workers=cfg.generate.io_workers,
+        queue_size=cfg.generate.prefetch,
+    )
+    LOGGER.info(
+        "generate_stage_timings task=%s batch_size=%s %s",
+        generator.edit_task,
+        size,
+        staged.timings.log_fields(),
+    )
+    return [records for batch in staged.results for records in batch]
+
+
+def _generate_parallel(
+    generator_cls: type[BaseGenerator],
+    context: GenerationContext,
+    jobs: list[tuple[int, SourceSample, DecomposeRecord]],
+    workers: int,
+) -> list[list[SampleRecord]]:
+    # One generator per worker thread; the context is shared and only read. numpy and the
+    # image codecs release the GIL, so threads scale without pickling the backend.
+    local = threading.local()
+
+    def _run(job: tuple[int, SourceSample, DecomposeRecord]) -> list[SampleRecord]:
+        generator = getattr(local, "generator", None)
+        if generator is None:
+            generator = local.generator = generator_cls(context)
+        return generator.generate(job[1], job[2])
+
+    LOGGER.info(
+        "generate_parallel task=%s workers=%s items=%s", generator_cls.edit_task, workers, len(jobs)
+    )
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run, jobs))
+
+
+def generate_records(cfg: AppConfig, sink: SampleSink | None = None) -> list[SampleRecord]:
     paths = resolve_paths(cfg)
     paths.ensure_runtime_dirs()
 
@@ -42,9 +100,11 @@ def run_generate(cfg: AppConfig) -> Path:
         cfg=cfg,
         staging_dir=paths.staging_dir / "generated",
         edit_backend=build_edit_backend(cfg),
+        sink=sink,
     )
 
-    generated: list[SampleRecord] = []
+    jobs_by_task: dict[str, list[tuple[int, SourceSample, DecomposeRecord]]] = {}
+    job_count = 0
     for source in source_rows:
         decompose = decompose_map.get(source.source_id)
         if decompose is None:
@@ -54,17 +114,55 @@ def run_generate(cfg: AppConfig) -> Path:
         task_name = cfg.generate.category_to_task.get(
             source.dataset_category, EditTask.SEMANTIC.value
         )
-        generator_cls = GENERATOR_MAP.get(task_name)
-        if generator_cls is None:
+        if task_name not in GENERATOR_MAP:
             LOGGER.warning(
                 "generate_skip_unknown_task category=%s task=%s", source.dataset_category, task_name
             )
             continue
 
-        generator = generator_cls(context)
-        generated.append(generator.generate(source, decompose))
+        jobs_by_task.setdefault(task_name, []).append((job_count, source, decompose))
+        job_count += 1
+
+    if sink is not None:
+        counts = {name: GENERATOR_MAP[name](context).variant_count() for name in jobs_by_task}
+        job_tasks = sorted(
+            (idx, source.source_id, name)
+            for name, jobs in jobs_by_task.items()
+            for idx, source, _ in jobs
+        )
+        sink.plan([(source_id, counts[name]) for _, source_id, name in job_tasks])
+
+    def _run_task(task_name: str) -> list[list[SampleRecord]]:
+        generator_cls = GENERATOR_MAP[task_name]
+        jobs = jobs_by_task[task_name]
+        workers = cfg.generate.workers_per_task.get(task_name, 1)
+        if workers > 1 or not generator_cls.uses_backend:
+            return _generate_parallel(generator_cls, context, jobs, max(1, workers))
+        return _generate_staged(generator_cls(context), jobs, cfg)
 
-    out_path = paths.manifests_dir / "generated_manifest.jsonl"
+    # Backend-free tasks run on CPU workers while backend tasks are fed to the backend one
+    # task (one prompt) at a time, so the backend never alternates between prompts.
+    cpu_tasks = [name for name in jobs_by_task if not GENERATOR_MAP[name].uses_backend]
+    backend_tasks = [name for name in jobs_by_task if GENERATOR_MAP[name].uses_backend]
+    task_records: dict[str, list[list[SampleRecord]]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(cpu_tasks))) as cpu_pool:
+        cpu_futures = {name: cpu_pool.submit(_run_task, name) for name in cpu_tasks}
+        for name in backend_tasks:
+            task_records[name] = _run_task(name)
+        for name, future in cpu_futures.items():
+            task_records[name] = future.result()
+
+    # Variants of one source stay adjacent, in variant order.
+    results: list[list[SampleRecord]] = [[] for _ in range(job_count)]
+    for task_name, jobs in jobs_by_task.items():
+        for (idx, _, _), records in zip(jobs, task_records[task_name], strict=True):
+            results[idx] = records
+    return [record for records in results for record in records]
+
+
+def run_generate(cfg: AppConfig) -> Path:
+    generated = generate_records(cfg)
+    out_path = resolve_paths(cfg).manifests_dir / "generated_manifest.jsonl"
     write_jsonl(out_path, [item.model_dump(mode="json") for item in generated])
     LOGGER.info("generate_done count=%s manifest=%s", len(generated), out_path)
     return out_path
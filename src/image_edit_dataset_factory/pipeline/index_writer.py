@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import IO
+
+from image_edit_dataset_factory.core.schema import SampleRecord
+from image_edit_dataset_factory.utils.file_ops import materialize
+from image_edit_dataset_factory.utils.jsonl import read_jsonl
+
+INDEX_CSV_NAME = "index.csv"
+INDEX_JSONL_NAME = "index.jsonl"
+ID_MAP_NAME = "id_map.jsonl"
+INDEX_COLUMNS = [
+    "sample_id",
+    "dataset_category",
+    "edit_task",
+    "subtype",
+    "scene",
+    "source_id",
+    "src_image_path",
+    "result_image_path",
+    "mask_paths",
+    "instruction_ch",
+    "instruction_en",
+    "metadata",
+]
+BUFFER_BYTES = 1 << 20
+
+
+def load_id_map(reports_dir: Path) -> dict[str, str]:
+    """Generation key (staged sample id) -> exported sample id, for every exported sample."""
+    return {str(row["key"]): str(row["sample_id"]) for row in read_jsonl(reports_dir / ID_MAP_NAME)}
+
+
+def _csv_row(sample: SampleRecord) -> list[object]:
+    return [
+        sample.sample_id,
+        sample.dataset_category,
+        sample.edit_task,
+        sample.subtype,
+        sample.scene,
+        sample.source_id,
+        sample.src_image_path,
+        sample.result_image_path,
+        "|".join(sample.mask_paths),
+        sample.instruction_ch,
+        sample.instruction_en,
+        json.dumps(sample.metadata, ensure_ascii=False),
+    ]
+
+
+class IndexSink:
+    """Writes index.csv, index.jsonl and the id map in one pass as samples are exported.
+
+    Rows go to buffered `.tmp` siblings that replace the real files on `commit`, so an
+    interrupted export leaves the previous index whole. With `append`, the temp files start
+    as reflinks/copies of the current ones. The id map is only rewritten when `track_ids`.
+    """
+
+    def __init__(self, reports_dir: Path, append: bool = False, track_ids: bool = True) -> None:
+        self.reports_dir = reports_dir
+        self.count = 0
+        names = [INDEX_CSV_NAME, INDEX_JSONL_NAME] + ([ID_MAP_NAME] if track_ids else [])
+        self._targets = [reports_dir / name for name in names]
+        self._handles: list[IO[str]] = []
+        for target in self._targets:
+            temp = self._temp(target)
+            if append and target.exists():
+                materialize(target, temp, "auto")
+            else:
+                temp.unlink(missing_ok=True)
+            self._handles.append(
+                temp.open("a", encoding="utf-8", newline="", buffering=BUFFER_BYTES)
+            )
+        csv_handle, self._jsonl = self._handles[:2]
+        self._id_map = self._handles[2] if track_ids else None
+        self._csv = csv.writer(csv_handle)
+        if csv_handle.tell() == 0:
+            self._csv.writerow(INDEX_COLUMNS)
+
+    @staticmethod
+    def _temp(target: Path) -> Path:
+        return target.with_name(target.name + ".tmp")
+
+    def write(self, sample: SampleRecord, key: str | None = None) -> None:
+        self._csv.writerow(_csv_row(sample))
+        self._jsonl.write(json.dumps(sample.model_dump(mode="json"), ensure_ascii=False) + "\n")
+        if key is not None and self._id_map is not None:
+            row = {"key": key, "source_id": sample.source_id, "sample_id": sample.sample_id}
+            self._id_map.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def commit(self) -> tuple[Path, Path]:
+        for handle in self._handles:
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.close()
+        for target in self._targets:
+            os.replace(self._temp(target), target)
+        return self._targets[0], self._targets[1]
+
+    def abort(self) -> None:
+        for handle, target in zip(self._handles, self._targets, strict=True):
+            handle.close()
+            self._temp(target).unlink(missing_ok=True)
+
+
+def write_index(
+    samples: Iterable[SampleRecord],
+    reports_dir: Path,
+    keys: Iterable[str] | None = None,
+    append: bool = False,
+) -> tuple[Path, Path]:
+    """Index already-exported records in one go; with `keys`, their id-map rows too."""
+    sink = IndexSink(reports_dir, append=append, track_ids=keys is not None)
+    try:
+        if keys is None:
+            for sample in samples:
+                sink.write(sample)
+        else:
+            for sample, key in zip(samples, keys, strict=True):
+                sink.write(sample, key)
+    except BaseException:
+        sink.abort()
+        raise
+    return sink.commit()
@@ -8,6 +8,8 @@ from image_edit_dataset_factory.pipeline.export import run_export
 from image_edit_dataset_factory.pipeline.generate_samples import run_generate
 from image_edit_dataset_factory.pipeline.ingest import run_ingest
 from image_edit_dataset_factory.pipeline.qa_step import run_qa
+from image_edit_dataset_factory.pipeline.streaming import run_streaming
+from image_edit_dataset_factory.utils.mask_io import MASK_CACHE
 
 LOGGER = logging.getLogger(__name__)
 
@@ -18,6 +20,8 @@ class PipelineOrchestrator:
 
     def run(self) -> dict[str, object]:
         summary: dict[str, object] = {}
+        # Derived masks are memoized per run; a fresh run must not reuse stale entries.
+        MASK_CACHE.clear()
 
         if self.cfg.pipeline.ingest:
             summary["ingest_manifest"] = str(run_ingest(self.cfg))
@@ -25,14 +29,29 @@ class PipelineOrchestrator:
         if self.cfg.pipeline.decompose:
             summary["decompose_manifest"] = str(run_decompose(self.cfg))
 
-        if self.cfg.pipeline.generate:
-            summary["generated_manifest"] = str(run_generate(self.cfg))
-
-        if self.cfg.pipeline.export:
-            summary["index_jsonl"] = str(run_export(self.cfg))
-
-        if self.cfg.pipeline.qa:
-            summary.update(run_qa(self.cfg))
-
+        stages = self.cfg.pipeline
+        tree_layout = self.cfg.export.layout == "tree"
+        if stages.streaming and stages.generate and stages.export and stages.qa and tree_layout:
+            summary.update(run_streaming(self.cfg))
+        else:
+            if stages.streaming and not tree_layout:
+                LOGGER.warning("streaming_disabled reason=shard_layout")
+            elif stages.streaming:
+                LOGGER.warning("streaming_disabled reason=generate_export_qa_not_all_enabled")
+            if stages.generate:
+                summary["generated_manifest"] = str(run_generate(self.cfg))
+
+            if stages.export:
+                summary["index_jsonl"] = str(run_export(self.cfg))
+
+            if stages.qa:
+                summary.update(run_qa(self.cfg))
+
+        LOGGER.info(
+            "mask_cache hits=%s misses=%s entries=%s",
+            MASK_CACHE.hits,
+            MASK_CACHE.misses,
+            len(MASK_CACHE),
+        )
         LOGGER.info("pipeline_done summary=%s", summary)
         return summary
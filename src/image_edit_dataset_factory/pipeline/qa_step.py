@@ -2,17 +2,38 @@ from __future__ import annotations
 
 import json
 import logging
+from pathlib import Path
 
-from image_edit_dataset_factory.core.config import AppConfig
+from image_edit_dataset_factory.core.config import AppConfig, QAConfig
 from image_edit_dataset_factory.core.paths import resolve_paths
-from image_edit_dataset_factory.core.schema import SampleRecord
-from image_edit_dataset_factory.qa.consistency import run_consistency
-from image_edit_dataset_factory.qa.linter import lint_dataset
+from image_edit_dataset_factory.core.schema import QAScore, SampleRecord
+from image_edit_dataset_factory.pipeline.shard_export import (
+    SHARD_DIR_NAME,
+    load_shard_arrays,
+    load_shard_index,
+)
+from image_edit_dataset_factory.qa.consistency import (
+    allowed_mask,
+    run_consistency,
+    score_non_edit_region,
+)
+from image_edit_dataset_factory.qa.linter import iter_lint_issues
 from image_edit_dataset_factory.qa.report import write_lint_report, write_qa_report
 
 LOGGER = logging.getLogger(__name__)
 
 
+def _score_shards(shard_dir: Path, samples: list[SampleRecord], qa_cfg: QAConfig) -> list[QAScore]:
+    # Shard records point into tars, so members are read by offset and decoded in memory.
+    by_id = {sample.sample_id: sample for sample in samples}
+    scores: list[QAScore] = []
+    for row in load_shard_index(shard_dir):
+        src, res, mask = load_shard_arrays(shard_dir, row)
+        allowed = allowed_mask(by_id[row["sample_id"]], qa_cfg, src.shape[:2], mask)
+        scores.append(score_non_edit_region(row["sample_id"], src, res, allowed, qa_cfg))
+    return scores
+
+
 def run_qa(cfg: AppConfig) -> dict[str, object]:
     paths = resolve_paths(cfg)
     paths.ensure_runtime_dirs()
@@ -28,16 +49,19 @@ def run_qa(cfg: AppConfig) -> dict[str, object]:
     else:
         samples = []
 
-    lint_issues = lint_dataset(paths.dataset_dir)
-    lint_report = write_lint_report(lint_issues, paths.reports_dir)
+    lint_issues = iter_lint_issues(paths.dataset_dir, cfg.export.id_width, cfg.qa.lint_workers)
+    lint_report, lint_issue_count = write_lint_report(lint_issues, paths.reports_dir)
 
-    qa_scores = run_consistency(samples, cfg.qa)
+    if cfg.export.layout == "shards":
+        qa_scores = _score_shards(paths.dataset_dir / SHARD_DIR_NAME, samples, cfg.qa)
+    else:
+        qa_scores = run_consistency(samples, cfg.qa)
     qa_csv, qa_summary = write_qa_report(qa_scores, paths.reports_dir / "qa")
     qa_fail_count = sum(1 for item in qa_scores if not item.passed)
 
     report = {
         "lint_report": str(lint_report),
-        "lint_issue_count": len(lint_issues),
+        "lint_issue_count": lint_issue_count,
         "qa_csv": str(qa_csv),
         "qa_summary": str(qa_summary),
         "qa_fail_count": qa_fail_count,
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from image_edit_dataset_factory.core.config import EncoderProfile
+from image_edit_dataset_factory.core.schema import SampleRecord
+from image_edit_dataset_factory.utils.image_io import (
+    decode_image_rgb,
+    encode_image_rgb,
+    is_upright_rgb_jpeg,
+    read_image_rgb,
+)
+from image_edit_dataset_factory.utils.mask_io import (
+    MASK_CACHE,
+    decode_binary_mask,
+    encode_binary_mask,
+    is_binary_png,
+    read_binary_mask,
+)
+from image_edit_dataset_factory.utils.tar_shards import (
+    TAR_BLOCK,
+    ShardWriter,
+    plan_shards,
+    read_member,
+    shard_name,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+SHARD_DIR_NAME = "shards"
+SHARD_INDEX_NAME = "index.jsonl"
+# Records exported to shards point at "<shard path>#<member name>".
+MEMBER_SEP = "#"
+
+
+def member_ref(shard_path: Path, member: str) -> str:
+    return f"{shard_path}{MEMBER_SEP}{member}"
+
+
+def _image_bytes(path: str, encoder: EncoderProfile, transfer: str) -> bytes:
+    if transfer != "transcode" and is_upright_rgb_jpeg(path):
+        return Path(path).read_bytes()
+    return encode_image_rgb(read_image_rgb(path), encoder)
+
+
+def _mask_bytes(path: str, encoder: EncoderProfile, transfer: str) -> bytes:
+    if transfer != "transcode" and is_binary_png(path):
+        return Path(path).read_bytes()
+    return encode_binary_mask(read_binary_mask(path), encoder)
+
+
+def sample_members(
+    sample: SampleRecord, sid: str, encoder: EncoderProfile, transfer: str
+) -> list[tuple[str, bytes]]:
+    """WebDataset members of one sample: `<sid>.<ext>`, all sharing the `<sid>` key."""
+    members = [
+        (f"{sid}.jpg", _image_bytes(sample.src_image_path, encoder, transfer)),
+        (f"{sid}.result.jpg", _image_bytes(sample.result_image_path, encoder, transfer)),
+        (f"{sid}.ch.txt", sample.instruction_ch.encode("utf-8")),
+        (f"{sid}.en.txt", sample.instruction_en.encode("utf-8")),
+    ]
+    if sample.mask_paths:
+        members.append((f"{sid}.mask.png", _mask_bytes(sample.mask_paths[0], encoder, transfer)))
+        if len(sample.mask_paths) > 1:
+            mask1 = _mask_bytes(sample.mask_paths[1], encoder, transfer)
+        else:
+            inverted = MASK_CACHE.inverted(read_binary_mask(sample.mask_paths[0]))
+            mask1 = encode_binary_mask(inverted, encoder)
+        members.append((f"{sid}.mask-1.png", mask1))
+    info = sample.model_dump(
+        mode="json",
+        include={"dataset_category", "edit_task", "subtype", "scene", "source_id", "metadata"},
+    )
+    info["sample_id"] = sid
+    members.append((f"{sid}.json", json.dumps(info, ensure_ascii=False).encode("utf-8")))
+    return members
+
+
+def _estimated_size(sample: SampleRecord) -> int:
+    # Staged file sizes plus a header block and padding per member; close for byte transfers.
+    paths = [sample.src_image_path, sample.result_image_path, *sample.mask_paths]
+    return sum(os.path.getsize(path) for path in paths) + 7 * 2 * TAR_BLOCK
+
+
+def _write_shard(
+    path: Path, jobs: list[tuple[SampleRecord, str]], encoder: EncoderProfile, transfer: str
+) -> tuple[list[SampleRecord], list[dict[str, Any]]]:
+    records: list[SampleRecord] = []
+    rows: list[dict[str, Any]] = []
+    with ShardWriter(path) as writer:
+        for sample, sid in jobs:
+            spans: dict[str, list[int]] = {}
+            for name, data in sample_members(sample, sid, encoder, transfer):
+                spans[name.split(".", 1)[1]] = list(writer.add(name, data))
+            masks = [key for key in ("mask.png", "mask-1.png") if key in spans]
+            records.append(
+                sample.model_copy(
+                    update={
+                        "sample_id": sid,
+                        "src_image_path": member_ref(path, f"{sid}.jpg"),
+                        "result_image_path": member_ref(path, f"{sid}.result.jpg"),
+                        "mask_paths": [member_ref(path, f"{sid}.{key}") for key in masks],
+                    }
+                )
+            )
+            rows.append({"sample_id": sid, "shard": path.name, "members": spans})
+    LOGGER.debug("shard_written path=%s samples=%s bytes=%s", path, len(jobs), writer.size)
+    return records, rows
+
+
+def export_shards(
+    jobs: list[tuple[SampleRecord, str]],
+    shard_dir: Path,
+    encoder: EncoderProfile,
+    transfer: str,
+    max_bytes: int,
+    max_samples: int,
+    workers: int,
+) -> Iterator[SampleRecord]:
+    """Write `jobs` into new size-bounded tar shards, one worker per shard.
+
+    Records are yielded in job order as each shard completes. Shards are numbered after any
+    already in `shard_dir`, and their rows are appended to the shard index, so resumed
+    exports only add shards.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    first_shard = len(list(shard_dir.glob("shard-*.tar")))
+    groups = plan_shards([_estimated_size(sample) for sample, _ in jobs], max_bytes, max_samples)
+
+    def _run(item: tuple[int, list[int]]) -> tuple[list[SampleRecord], list[dict[str, Any]]]:
+        shard_idx, members = item
+        path = shard_dir / shard_name(first_shard + shard_idx)
+        return _write_shard(path, [jobs[idx] for idx in members], encoder, transfer)
+
+    LOGGER.info("shard_export_start samples=%s shards=%s", len(jobs), len(groups))
+    with (
+        ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(groups))), thread_name_prefix="shard"
+        ) as pool,
+        (shard_dir / SHARD_INDEX_NAME).open("a", encoding="utf-8") as index,
+    ):
+        for records, rows in pool.map(_run, enumerate(groups)):
+            for row in rows:
+                index.write(json.dumps(row, ensure_ascii=False) + "\n")
+            yield from records
+
+
+def load_shard_index(shard_dir: Path) -> list[dict[str, Any]]:
+    path = shard_dir / SHARD_INDEX_NAME
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def read_shard_member(shard_dir: Path, row: dict[str, Any], key: str) -> bytes:
+    offset, size = row["members"][key]
+    return read_member(shard_dir / row["shard"], offset, size)
+
+
+def load_shard_arrays(
+    shard_dir: Path, row: dict[str, Any]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """Decoded source, result and mask of one indexed sample, read by offset."""
+    source = decode_image_rgb(read_shard_member(shard_dir, row, "jpg"))
+    result = decode_image_rgb(read_shard_member(shard_dir, row, "result.jpg"))
+    mask = None
+    if "mask.png" in row["members"]:
+        mask = decode_binary_mask(read_shard_member(shard_dir, row, "mask.png"))
+    return source, result, mask
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+import numpy as np
+
+from image_edit_dataset_factory.core.config import AppConfig
+from image_edit_dataset_factory.core.paths import resolve_paths
+from image_edit_dataset_factory.core.schema import QAScore, SampleRecord
+from image_edit_dataset_factory.pipeline.export import (
+    SampleArrays,
+    export_sample,
+    id_allocator,
+    reset_dataset_dir,
+)
+from image_edit_dataset_factory.pipeline.generate.base import PreparedSample
+from image_edit_dataset_factory.pipeline.generate_samples import generate_records
+from image_edit_dataset_factory.pipeline.index_writer import write_index
+from image_edit_dataset_factory.qa.consistency import score_non_edit_region
+from image_edit_dataset_factory.qa.linter import iter_lint_issues
+from image_edit_dataset_factory.qa.report import write_lint_report, write_qa_report
+from image_edit_dataset_factory.utils.mask_io import MASK_CACHE
+from image_edit_dataset_factory.utils.naming import format_sample_id
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ExportQASink:
+    """Exports and scores each generated variant as soon as its arrays exist.
+
+    Sample ids are fixed up front from the per-source variant counts, so they match what the
+    staged generate -> export path assigns for the same manifest.
+    """
+
+    def __init__(self, cfg: AppConfig) -> None:
+        self.cfg = cfg
+        self.dataset_dir = resolve_paths(cfg).dataset_dir
+        self.encoder = cfg.encoding.export_profile
+        self.scores: list[QAScore] = []
+        # Exported sample id -> generation key, for the id map.
+        self.keys: dict[str, str] = {}
+        self._first_id: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def plan(self, variant_counts: list[tuple[str, int]]) -> None:
+        next_idx = 1
+        for source_id, count in variant_counts:
+            self._first_id[source_id] = next_idx
+            next_idx += count
+
+    def emit(
+        self,
+        prepared: PreparedSample,
+        variant: int,
+        record: SampleRecord,
+        edited: np.ndarray,
+        allowed: np.ndarray | None,
+    ) -> SampleRecord:
+        sid = format_sample_id(self._first_id[record.source_id] + variant, self.cfg.export.id_width)
+        exported = export_sample(
+            record,
+            sid,
+            self.dataset_dir,
+            self.encoder,
+            SampleArrays(source=prepared.image, result=edited, mask=prepared.mask),
+        )
+        if allowed is None:
+            allowed = MASK_CACHE.dilated(prepared.mask, self.cfg.qa.allowed_region_dilation_px)
+        # Scores the arrays handed to the encoder, not a re-decode of the written JPEGs.
+        score = score_non_edit_region(sid, prepared.image, edited, allowed, self.cfg.qa)
+        with self._lock:
+            self.scores.append(score)
+            self.keys[sid] = record.sample_id
+        return exported
+
+
+def run_streaming(cfg: AppConfig) -> dict[str, object]:
+    """Generate, export and QA in one pass, handing decoded arrays between stages."""
+    paths = resolve_paths(cfg)
+    paths.ensure_runtime_dirs()
+    reset_dataset_dir(cfg)
+
+    sink = ExportQASink(cfg)
+    exported = generate_records(cfg, sink=sink)
+
+    # No generated manifest is written: staged results are never materialised, and a later
+    # standalone export must not pick up records that already point into the dataset.
+    keys = [sink.keys[record.sample_id] for record in exported]
+    _, index_jsonl = write_index(exported, paths.reports_dir, keys=keys)
+    # Ids here are numbered from 1 by plan(); keep the shared counter ahead of them.
+    id_allocator(cfg).advance_to(len(exported) + 1)
+
+    lint_issues = iter_lint_issues(paths.dataset_dir, cfg.export.id_width, cfg.qa.lint_workers)
+    lint_report, lint_issue_count = write_lint_report(lint_issues, paths.reports_dir)
+    scores = sorted(sink.scores, key=lambda item: item.sample_id)
+    qa_csv, qa_summary = write_qa_report(scores, paths.reports_dir / "qa")
+
+    summary: dict[str, object] = {
+        "index_jsonl": str(index_jsonl),
+        "lint_report": str(lint_report),
+        "lint_issue_count": lint_issue_count,
+        "qa_csv": str(qa_csv),
+        "qa_summary": str(qa_summary),
+        "qa_fail_count": sum(1 for item in scores if not item.passed),
+    }
+    LOGGER.info("streaming_done count=%s summary=%s", len(exported), summary)
+    return summary
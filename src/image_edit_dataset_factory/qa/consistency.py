@@ -6,29 +6,46 @@ import numpy as np
 
 from image_edit_dataset_factory.core.config import QAConfig
 from image_edit_dataset_factory.core.schema import QAScore, SampleRecord
-from image_edit_dataset_factory.utils.image_io import read_image_rgb, read_mask
-from image_edit_dataset_factory.utils.mask_ops import dilate_mask, ensure_binary
-from image_edit_dataset_factory.utils.metrics import ssim_rgb
+from image_edit_dataset_factory.utils.image_io import read_image_rgb
+from image_edit_dataset_factory.utils.mask_io import MASK_CACHE, read_binary_mask
+from image_edit_dataset_factory.utils.metrics import masked_diff_stats, ssim_rgb_tiled
 
 
-def _allowed_mask(sample: SampleRecord, qa_cfg: QAConfig, shape: tuple[int, int]) -> np.ndarray:
+def allowed_mask(
+    sample: SampleRecord,
+    qa_cfg: QAConfig,
+    shape: tuple[int, int],
+    mask: np.ndarray | None = None,
+) -> np.ndarray:
+    # `mask` is the decoded edit mask when the caller already has it (e.g. from a shard).
     explicit = sample.metadata.get("allowed_region_mask_path")
     if isinstance(explicit, str) and Path(explicit).exists():
-        return ensure_binary(read_mask(explicit))
-    if sample.mask_paths:
-        return dilate_mask(
-            ensure_binary(read_mask(sample.mask_paths[0])), pixels=qa_cfg.allowed_region_dilation_px
-        )
+        return read_binary_mask(explicit)
+    if mask is None and sample.mask_paths:
+        mask = read_binary_mask(sample.mask_paths[0])
+    if mask is not None:
+        return MASK_CACHE.dilated(mask, qa_cfg.allowed_region_dilation_px)
     return np.full(shape, 255, dtype=np.uint8)
 
 
 def check_non_edit_region(sample: SampleRecord, qa_cfg: QAConfig) -> QAScore:
     src = read_image_rgb(sample.src_image_path)
     res = read_image_rgb(sample.result_image_path)
+    allowed = allowed_mask(sample, qa_cfg, src.shape[:2])
+    return score_non_edit_region(sample.sample_id, src, res, allowed, qa_cfg)
+
 
+def score_non_edit_region(
+    sample_id: str,
+    src: np.ndarray,
+    res: np.ndarray,
+    allowed: np.ndarray,
+    qa_cfg: QAConfig,
+) -> QAScore:
+    """Score decoded arrays directly; the streaming pipeline calls this without touching disk."""
     if src.shape != res.shape:
         return QAScore(
-            sample_id=sample.sample_id,
+            sample_id=sample_id,
             passed=False,
             mse_outside_region=1e9,
             ssim_outside_region=0.0,
@@ -36,11 +53,10 @@ def check_non_edit_region(sample: SampleRecord, qa_cfg: QAConfig) -> QAScore:
             details={"error": "shape_mismatch"},
         )
 
-    allowed = _allowed_mask(sample, qa_cfg, src.shape[:2])
     outside = allowed == 0
     if np.count_nonzero(outside) == 0:
         return QAScore(
-            sample_id=sample.sample_id,
+            sample_id=sample_id,
             passed=True,
             mse_outside_region=0.0,
             ssim_outside_region=1.0,
@@ -48,17 +64,9 @@ def check_non_edit_region(sample: SampleRecord, qa_cfg: QAConfig) -> QAScore:
             details={"outside_region_empty": True},
         )
 
-    src_out = src[outside]
-    res_out = res[outside]
-    mse_value = float(np.mean((src_out.astype(np.float32) - res_out.astype(np.float32)) ** 2))
-    changed_ratio = float(
-        np.mean(np.any(np.abs(src_out.astype(np.int16) - res_out.astype(np.int16)) > 2, axis=1))
-    )
-
-    src_masked = src.copy()
-    res_masked = res.copy()
-    src_masked[allowed > 0] = res_masked[allowed > 0]
-    ssim_value = ssim_rgb(src_masked, res_masked)
+    # Tiled metrics keep float copies bounded by tile size on very large scans.
+    mse_value, changed_ratio = masked_diff_stats(src, res, outside, threshold=2)
+    ssim_value = ssim_rgb_tiled(src, res, ignore=~outside)
 
     passed = (
         mse_value <= qa_cfg.max_mse_outside_region
@@ -67,7 +75,7 @@ def check_non_edit_region(sample: SampleRecord, qa_cfg: QAConfig) -> QAScore:
     )
 
     return QAScore(
-        sample_id=sample.sample_id,
+        sample_id=sample_id,
         passed=passed,
         mse_outside_region=mse_value,
         ssim_outside_region=ssim_value,
@@ -1,78 +1,120 @@
 from __future__ import annotations
 
+import os
 import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from image_edit_dataset_factory.core.schema import LintIssue
-from image_edit_dataset_factory.utils.image_io import image_shape, is_corrupted
+from image_edit_dataset_factory.utils.image_io import decoded_size
+from image_edit_dataset_factory.utils.naming import DEFAULT_ID_WIDTH
 
-SRC_RE = re.compile(r"^(\d{5})\.jpg$")
-RES_RE = re.compile(r"^(\d{5})_result\.jpg$")
-CH_RE = re.compile(r"^(\d{5})_CH\.txt$")
-EN_RE = re.compile(r"^(\d{5})_EN\.txt$")
-MASK_RE = re.compile(r"^(\d{5})_mask\.png$")
-MASK1_RE = re.compile(r"^(\d{5})_mask-1\.png$")
+NAME_SUFFIXES = [
+    (r"\.jpg", "src"),
+    (r"_result\.jpg", "result"),
+    (r"_CH\.txt", "ch"),
+    (r"_EN\.txt", "en"),
+    (r"_mask\.png", "mask"),
+    (r"_mask-1\.png", "mask1"),
+]
+
+
+@lru_cache(maxsize=8)
+def name_patterns(width: int = DEFAULT_ID_WIDTH) -> list[tuple[re.Pattern[str], str]]:
+    return [(re.compile(rf"^(\d{{{width}}}){suffix}$"), kind) for suffix, kind in NAME_SUFFIXES]
 
 
 REQUIRED = {"src", "result", "ch", "en"}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
 
 
 def _issue(path: Path, code: str, message: str) -> LintIssue:
     return LintIssue(path=str(path), code=code, message=message)
 
 
-def lint_dataset(dataset_dir: str | Path) -> list[LintIssue]:
-    root = Path(dataset_dir)
-    if not root.exists():
-        return [_issue(root, "missing_dataset", "dataset directory not found")]
+def _scene_dirs(root: Path) -> list[tuple[Path, list[str]]]:
+    # One directory walk yields the scene dirs and their file names together.
+    scenes: list[tuple[Path, list[str]]] = []
+    for dirpath, _, filenames in os.walk(root):
+        scene_dir = Path(dirpath)
+        if len(scene_dir.parts) >= len(root.parts) + 3 and filenames:
+            scenes.append((scene_dir, sorted(filenames)))
+    scenes.sort()
+    return scenes
 
+
+def lint_scene(
+    scene_dir: Path, filenames: list[str], id_width: int = DEFAULT_ID_WIDTH
+) -> list[LintIssue]:
+    """Lint one scene directory, decoding each image exactly once."""
+    patterns = name_patterns(id_width)
     issues: list[LintIssue] = []
-    for scene_dir in sorted(
-        path for path in root.rglob("*") if path.is_dir() and len(path.parts) >= len(root.parts) + 3
-    ):
-        files = [p for p in scene_dir.iterdir() if p.is_file()]
-        if not files:
-            continue
-
-        by_id: dict[str, set[str]] = {}
-        for file in files:
-            matched = False
-            for regex, kind in [
-                (SRC_RE, "src"),
-                (RES_RE, "result"),
-                (CH_RE, "ch"),
-                (EN_RE, "en"),
-                (MASK_RE, "mask"),
-                (MASK1_RE, "mask1"),
-            ]:
-                m = regex.match(file.name)
-                if m:
-                    sid = m.group(1)
-                    by_id.setdefault(sid, set()).add(kind)
-                    matched = True
-                    break
-            if not matched:
-                issues.append(_issue(file, "bad_name", "file name does not follow naming spec"))
-
-            if file.suffix.lower() in {".jpg", ".jpeg", ".png"} and is_corrupted(file):
+    by_id: dict[str, set[str]] = {}
+    sizes: dict[str, tuple[int, int] | None] = {}
+    for name in filenames:
+        file = scene_dir / name
+        for regex, kind in patterns:
+            m = regex.match(name)
+            if m:
+                by_id.setdefault(m.group(1), set()).add(kind)
+                break
+        else:
+            issues.append(_issue(file, "bad_name", "file name does not follow naming spec"))
+
+        if file.suffix.lower() in IMAGE_SUFFIXES:
+            sizes[name] = decoded_size(file)
+            if sizes[name] is None:
                 issues.append(_issue(file, "corrupted", "corrupted image file"))
 
-        for sid, kinds in by_id.items():
-            missing = REQUIRED - kinds
-            if missing:
-                issues.append(
-                    _issue(scene_dir / sid, "missing_required", f"missing files: {sorted(missing)}")
+    for sid, kinds in by_id.items():
+        missing = REQUIRED - kinds
+        if missing:
+            issues.append(
+                _issue(scene_dir / sid, "missing_required", f"missing files: {sorted(missing)}")
+            )
+
+        if "mask" in kinds and "mask1" not in kinds:
+            issues.append(
+                _issue(scene_dir / sid, "missing_mask1", "mask exists but mask-1 is missing")
+            )
+
+        # Dimensions come from the decode above; corrupt images are already reported.
+        src_size = sizes.get(f"{sid}.jpg")
+        res_size = sizes.get(f"{sid}_result.jpg")
+        if src_size is not None and res_size is not None and src_size != res_size:
+            issues.append(
+                _issue(
+                    scene_dir / f"{sid}_result.jpg",
+                    "shape_mismatch",
+                    "source and result shape mismatch",
                 )
+            )
+    return issues
 
-            if "mask" in kinds and "mask1" not in kinds:
-                issues.append(
-                    _issue(scene_dir / sid, "missing_mask1", "mask exists but mask-1 is missing")
-                )
 
-            src = scene_dir / f"{sid}.jpg"
-            res = scene_dir / f"{sid}_result.jpg"
-            if src.exists() and res.exists():
-                if image_shape(src) != image_shape(res):
-                    issues.append(_issue(res, "shape_mismatch", "source and result shape mismatch"))
+def iter_lint_issues(
+    dataset_dir: str | Path, id_width: int = DEFAULT_ID_WIDTH, workers: int = 8
+) -> Iterator[LintIssue]:
+    """Lint scene directories on `workers` threads, yielding issues in scene order as they
+    complete so reports can be written without holding every issue."""
+    root = Path(dataset_dir)
+    if not root.exists():
+        yield _issue(root, "missing_dataset", "dataset directory not found")
+        return
 
-    return issues
+    scenes = _scene_dirs(root)
+
+    def _run(scene: tuple[Path, list[str]]) -> list[LintIssue]:
+        return lint_scene(scene[0], scene[1], id_width)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="lint") as pool:
+        for issues in pool.map(_run, scenes):
+            yield from issues
+
+
+def lint_dataset(
+    dataset_dir: str | Path, id_width: int = DEFAULT_ID_WIDTH, workers: int = 8
+) -> list[LintIssue]:
+    return list(iter_lint_issues(dataset_dir, id_width, workers))
@@ -2,20 +2,26 @@ from __future__ import annotations
 
 import csv
 import json
+from collections.abc import Iterable
 from pathlib import Path
 
 from image_edit_dataset_factory.core.schema import LintIssue, QAScore
 
 
-def write_lint_report(issues: list[LintIssue], report_dir: str | Path) -> Path:
+def write_lint_report(issues: Iterable[LintIssue], report_dir: str | Path) -> tuple[Path, int]:
+    """Stream issues into lint_issues.json; the file matches `json.dumps(list, indent=2)`."""
     out_dir = Path(report_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     path = out_dir / "lint_issues.json"
-    path.write_text(
-        json.dumps([item.model_dump(mode="json") for item in issues], ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
-    return path
+    count = 0
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write("[")
+        for item in issues:
+            body = json.dumps(item.model_dump(mode="json"), ensure_ascii=False, indent=2)
+            handle.write(("\n  " if count == 0 else ",\n  ") + body.replace("\n", "\n  "))
+            count += 1
+        handle.write("\n]" if count else "]")
+    return path, count
 
 
 def write_qa_report(scores: list[QAScore], report_dir: str | Path) -> tuple[Path, Path]:
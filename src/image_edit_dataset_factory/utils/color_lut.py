@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+IDENTITY_LUT = np.arange(256, dtype=np.uint8)
+
+
+def gain_lut(gain: float) -> np.ndarray:
+    """256-entry table for `clip(x * gain)`, truncated like the float32 path it replaces."""
+    values = np.arange(256, dtype=np.float32) * np.float32(gain)
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+
+def stack_channel_luts(luts: Sequence[np.ndarray]) -> np.ndarray:
+    """Pack per-channel tables into the 1x256xC layout cv2.LUT expects."""
+    return np.ascontiguousarray(np.stack(luts, axis=-1)[None, :, :])
+
+
+def contrast_table(factor: float) -> np.ndarray:
+    values = (np.arange(256, dtype=np.float32) - np.float32(127.5)) * np.float32(factor)
+    lut = np.clip(values + np.float32(127.5), 0, 255).astype(np.uint8)
+    return stack_channel_luts([lut, lut, lut])
+
+
+def brightness_table(delta: float) -> np.ndarray:
+    lut = np.clip(np.arange(256, dtype=np.int16) + int(delta), 0, 255).astype(np.uint8)
+    return stack_channel_luts([lut, lut, lut])
+
+
+def color_tone_table(warmth: float) -> np.ndarray:
+    # Positive warmth lifts red and cuts blue by the same fraction; 0.08 is the legacy tone.
+    return stack_channel_luts([gain_lut(1.0 + warmth), IDENTITY_LUT, gain_lut(1.0 - warmth)])
+
+
+STYLE_OPS: dict[str, Callable[[float], np.ndarray]] = {
+    "contrast": contrast_table,
+    "brightness": brightness_table,
+    "color_tone": color_tone_table,
+}
+
+# One (op, amount) pair per step, applied left to right.
+StyleChain = tuple[tuple[str, float], ...]
+
+
+def compose_tables(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Table equivalent to applying `first` and then `second`, rounding to uint8 in between."""
+    channels = [second[0, :, c][first[0, :, c]] for c in range(first.shape[-1])]
+    return stack_channel_luts(channels)
+
+
+@lru_cache(maxsize=512)
+def style_table(chain: StyleChain) -> np.ndarray:
+    """Single packed table for a chain of style ops; cached so variants reuse their tables."""
+    table = stack_channel_luts([IDENTITY_LUT] * 3)
+    for name, amount in chain:
+        if name not in STYLE_OPS:
+            msg = f"Unknown style op: {name}"
+            raise ValueError(msg)
+        table = compose_tables(table, STYLE_OPS[name](amount))
+    table.flags.writeable = False
+    return table
+
+
+def style_variant_chains(
+    ops: Sequence[str], amounts: dict[str, Sequence[float]]
+) -> list[StyleChain]:
+    """Cartesian grid of chains, one amount per op, e.g. 3 contrasts x 4 tones = 12 variants."""
+    chains: list[StyleChain] = [()]
+    for name in ops:
+        chains = [chain + ((name, amount),) for chain in chains for amount in amounts[name]]
+    return chains
+
+
+def apply_luts(
+    image: np.ndarray,
+    table: np.ndarray,
+    region: np.ndarray | None = None,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Apply a packed per-channel table; pixels outside `region` keep their input values.
+
+    Pass `out` to reuse one buffer across many variants of the same source.
+    """
+    out = cv2.LUT(image, table, dst=out)
+    if region is not None:
+        np.copyto(out, image, where=~region[..., None])
+    return out
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+
+
+def link_or_copy(src: str | Path, dst: str | Path) -> str:
+    """Materialize `src` at `dst` without re-encoding; returns "hardlink" or "copy".
+
+    Any existing `dst` is unlinked first so a later in-place write to `dst` can never
+    reach through a hardlink into the original file.
+    """
+    source = Path(src)
+    target = Path(dst)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+        return "hardlink"
+    except OSError:
+        shutil.copyfile(source, target)
+        return "copy"
+
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+TRANSFER_METHODS = ("auto", "hardlink", "copy")
+
+
+def reflink(src: str | Path, dst: str | Path) -> None:
+    """Copy-on-write clone of `src`; raises OSError where the filesystem cannot clone."""
+    import fcntl
+
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        except OSError:
+            target.close()
+            Path(dst).unlink(missing_ok=True)
+            raise
+
+
+def materialize(src: str | Path, dst: str | Path, method: str = "auto") -> str:
+    """Place the bytes of `src` at `dst`; returns "reflink", "hardlink" or "copy".
+
+    "auto" tries a reflink (btrfs, XFS) and falls back to a plain copy. It never hardlinks:
+    staged files are rewritten in place by later runs, which would reach through a hardlink
+    into `dst`.
+    """
+    if method not in TRANSFER_METHODS:
+        msg = f"method must be one of {'/'.join(TRANSFER_METHODS)}, got: {method}"
+        raise ValueError(msg)
+    if method == "hardlink":
+        return link_or_copy(src, dst)
+    target = Path(dst)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    if method == "auto":
+        try:
+            reflink(src, target)
+            return "reflink"
+        except (OSError, ImportError):
+            pass
+    shutil.copyfile(src, target)
+    return "copy"
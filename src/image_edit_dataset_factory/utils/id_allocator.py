@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import fcntl
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+
+class IdAllocator:
+    """Hands out blocks of sample ids from a counter file held under an exclusive flock.
+
+    The file stores the next free id. Exporters sharing it (threads, processes, or hosts on
+    a lock-aware NFS mount) always get disjoint blocks, and nothing scans the dataset tree.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def _update(self, step: Callable[[int | None], tuple[int, int]]) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+", encoding="utf-8") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            raw = handle.read().strip()
+            result, next_id = step(int(raw) if raw else None)
+            handle.seek(0)
+            handle.truncate()
+            handle.write(f"{next_id}\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        return result
+
+    def reserve(self, count: int, initial: Callable[[], int] | None = None) -> int:
+        """Claim `count` consecutive ids and return the first one.
+
+        `initial` seeds a missing counter (e.g. from a one-off scan of an older dataset); it
+        runs under the lock, so only the first exporter pays for it.
+        """
+        if count < 0:
+            msg = "count must be >= 0"
+            raise ValueError(msg)
+
+        def _step(current: int | None) -> tuple[int, int]:
+            first = current if current is not None else (initial() if initial else 1)
+            return first, first + count
+
+        return self._update(_step)
+
+    def advance_to(self, next_id: int) -> None:
+        """Move the counter forward to at least `next_id`, for ids assigned elsewhere."""
+        self._update(lambda current: (0, max(current or 1, next_id)))
+
+    def peek(self) -> int | None:
+        if not self.path.exists():
+            return None
+        raw = self.path.read_text(encoding="utf-8").strip()
+        return int(raw) if raw else None
+
+    def reset(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import io
 from pathlib import Path
+from typing import Any
 
 import cv2
 import numpy as np
 from PIL import Image, ImageOps
 
+from image_edit_dataset_factory.core.config import EncoderProfile
+from image_edit_dataset_factory.utils.file_ops import link_or_copy
+
 
 def read_image_pil(path: str | Path, mode: str = "RGB") -> Image.Image:
     with Image.open(path) as img:
@@ -23,21 +28,89 @@ def read_mask(path: str | Path) -> np.ndarray:
         return np.asarray(img.convert("L"))
 
 
-def write_image_rgb(path: str | Path, image: np.ndarray, quality: int = 95) -> None:
+def _save_options(target: Path, profile: EncoderProfile | None) -> dict[str, Any]:
+    suffix = target.suffix.lower()
+    if suffix in {".jpg", ".jpeg"}:
+        if profile is None:
+            return {"quality": 95, "optimize": True}
+        options: dict[str, Any] = {
+            "quality": profile.jpeg_quality,
+            "optimize": profile.jpeg_optimize,
+            "progressive": profile.jpeg_progressive,
+        }
+        if profile.jpeg_subsampling is not None:
+            options["subsampling"] = profile.jpeg_subsampling
+        return options
+    if suffix == ".png" and profile is not None:
+        return {"compress_level": profile.png_compress_level}
+    return {}
+
+
+def write_image_rgb(
+    path: str | Path,
+    image: np.ndarray,
+    quality: int = 95,
+    profile: EncoderProfile | None = None,
+) -> None:
     target = Path(path)
     target.parent.mkdir(parents=True, exist_ok=True)
     pil_image = Image.fromarray(image.astype(np.uint8), mode="RGB")
-    if target.suffix.lower() in {".jpg", ".jpeg"}:
-        pil_image.save(target, quality=quality, optimize=True)
-    else:
-        pil_image.save(target)
+    options = _save_options(target, profile)
+    if profile is None and "quality" in options:
+        options["quality"] = quality
+    pil_image.save(target, **options)
+
+
+def encode_image_rgb(image: np.ndarray, profile: EncoderProfile | None = None) -> bytes:
+    """JPEG bytes with the same options write_image_rgb would use for a .jpg target."""
+    buffer = io.BytesIO()
+    options = _save_options(Path("image.jpg"), profile)
+    Image.fromarray(image.astype(np.uint8), mode="RGB").save(buffer, format="JPEG", **options)
+    return buffer.getvalue()
+
 
+def decode_image_rgb(data: bytes) -> np.ndarray:
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(ImageOps.exif_transpose(img).convert("RGB"))
 
-def write_mask(path: str | Path, mask: np.ndarray) -> None:
+
+def write_mask(path: str | Path, mask: np.ndarray, profile: EncoderProfile | None = None) -> None:
     target = Path(path)
     target.parent.mkdir(parents=True, exist_ok=True)
     mask_img = Image.fromarray(mask.astype(np.uint8), mode="L")
-    mask_img.save(target)
+    mask_img.save(target, **_save_options(target, profile))
+
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+
+def is_upright_rgb_jpeg(path: str | Path) -> bool:
+    # True when the file bytes already decode to what read_image_rgb returns.
+    try:
+        with Image.open(path) as img:
+            orientation = img.getexif().get(EXIF_ORIENTATION_TAG, 1)
+            return img.format == "JPEG" and img.mode == "RGB" and orientation == 1
+    except OSError:
+        return False
+
+
+def stage_source_image(
+    source_path: str | Path,
+    target: str | Path,
+    image: np.ndarray,
+    profile: EncoderProfile | None = None,
+) -> str:
+    """Write the unchanged source to `target`; returns "hardlink", "copy" or "encode".
+
+    Upright RGB JPEGs are linked or copied byte-for-byte when the target is a JPEG too;
+    anything else is re-encoded from the decoded `image`.
+    """
+    target_path = Path(target)
+    if target_path.suffix.lower() in {".jpg", ".jpeg"} and is_upright_rgb_jpeg(source_path):
+        return link_or_copy(source_path, target_path)
+    target_path.unlink(missing_ok=True)
+    write_image_rgb(target_path, image, profile=profile)
+    return "encode"
 
 
 def convert_image(path: str | Path, output_path: str | Path, mode: str = "RGB") -> None:
@@ -53,6 +126,39 @@ def image_shape(path: str | Path) -> tuple[int, int]:
         return fixed.width, fixed.height
 
 
+class LazyImage:
+    """RGB image handle that decodes on first pixel access.
+
+    When width/height are known up front (e.g. from the source manifest), `shape`
+    never touches the file.
+    """
+
+    def __init__(self, path: str | Path, width: int | None = None, height: int | None = None):
+        self.path = Path(path)
+        self._size = (width, height) if width and height else None
+        self._array: np.ndarray | None = None
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._array is not None
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        if self._array is not None:
+            h, w = self._array.shape[:2]
+            return h, w, 3
+        if self._size is None:
+            self._size = image_shape(self.path)
+        w, h = self._size
+        return h, w, 3
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = read_image_rgb(self.path)
+        return self._array
+
+
 def is_image_file(path: str | Path) -> bool:
     return Path(path).suffix.lower() in {".jpg", ".jpeg", ".png", ".webp"}
 
@@ -67,6 +173,23 @@ def is_corrupted(path: str | Path) -> bool:
         return True
 
 
+# EXIF orientations that rotate by 90/270 degrees, so exif_transpose swaps width and height.
+TRANSPOSING_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def decoded_size(path: str | Path) -> tuple[int, int] | None:
+    """Fully decode `path` once; upright (width, height) as image_shape, or None if corrupt."""
+    try:
+        with Image.open(path) as img:
+            img.load()
+            orientation = img.getexif().get(EXIF_ORIENTATION_TAG, 1)
+            if orientation in TRANSPOSING_ORIENTATIONS:
+                return img.height, img.width
+            return img.width, img.height
+    except Exception:
+        return None
+
+
 def ensure_jpeg(path: str | Path, output_path: str | Path) -> Path:
     img = read_image_pil(path, mode="RGB")
     target = Path(output_path)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from image_edit_dataset_factory.backends.layered_base import LayerOutput
+
+# Container layout (one compressed .npz per source image):
+#   shape            int64[2]   full-resolution (h, w)
+#   layer_ids        int64[n]   original layer ids
+#   bbox_{i}         int64[4]   x0, y0, x1, y1 (exclusive end) of alpha > 0
+#   alpha_{i}        uint8      alpha cropped to bbox (soft alphas)
+#   alphabits_{i}    uint8      packed bits of the cropped alpha (binary alphas)
+#   rgb_{i}          uint8[k,3] RGB values where the cropped alpha > 0, row-major
+
+
+def _alpha_2d(alpha: np.ndarray) -> np.ndarray:
+    if alpha.ndim == 3:
+        alpha = alpha[:, :, 0]
+    return alpha.astype(np.uint8, copy=False)
+
+
+def _alpha_bbox(alpha: np.ndarray) -> tuple[int, int, int, int]:
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if rows.size == 0:
+        return 0, 0, 0, 0
+    cols = np.flatnonzero(alpha.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def write_layer_store(path: str | Path, layers: Sequence[LayerOutput]) -> Path:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    if layers:
+        shape = _alpha_2d(layers[0].alpha).shape
+    else:
+        shape = (0, 0)
+
+    arrays: dict[str, np.ndarray] = {
+        "shape": np.asarray(shape, dtype=np.int64),
+        "layer_ids": np.asarray([layer.layer_id for layer in layers], dtype=np.int64),
+    }
+    for idx, layer in enumerate(layers):
+        alpha = _alpha_2d(layer.alpha)
+        if alpha.shape != shape:
+            msg = f"layer {idx} alpha shape {alpha.shape} does not match {shape}"
+            raise ValueError(msg)
+
+        x0, y0, x1, y1 = _alpha_bbox(alpha)
+        crop = alpha[y0:y1, x0:x1]
+        arrays[f"bbox_{idx}"] = np.asarray([x0, y0, x1, y1], dtype=np.int64)
+        if np.isin(crop, (0, 255)).all():
+            arrays[f"alphabits_{idx}"] = np.packbits(crop > 0, axis=None)
+        else:
+            arrays[f"alpha_{idx}"] = crop
+
+        rgb = layer.rgba[y0:y1, x0:x1, :3]
+        arrays[f"rgb_{idx}"] = np.ascontiguousarray(rgb[crop > 0], dtype=np.uint8)
+
+    # Write to a sibling file first so an interrupted run never leaves a truncated store
+    # behind for the resume path to pick up.
+    tmp = target.with_name(f".{target.name}.tmp")
+    with tmp.open("wb") as handle:
+        np.savez_compressed(handle, **arrays)
+    tmp.replace(target)
+    return target
+
+
+class LayerStore:
+    """Random-access reader for a compact layer container.
+
+    Members are decompressed lazily, so reading one layer does not touch the others.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._npz = np.load(self.path)
+        try:
+            h, w = (int(v) for v in self._npz["shape"])
+            self.shape: tuple[int, int] = (h, w)
+            self.layer_ids: list[int] = [int(v) for v in self._npz["layer_ids"]]
+        except Exception:
+            self._npz.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self.layer_ids)
+
+    def __enter__(self) -> LayerStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._npz.close()
+
+    def bbox(self, idx: int) -> tuple[int, int, int, int]:
+        x0, y0, x1, y1 = (int(v) for v in self._npz[f"bbox_{idx}"])
+        return x0, y0, x1, y1
+
+    def _alpha_crop(self, idx: int, bbox: tuple[int, int, int, int]) -> np.ndarray:
+        x0, y0, x1, y1 = bbox
+        key = f"alpha_{idx}"
+        if key in self._npz.files:
+            return self._npz[key]
+        count = (y1 - y0) * (x1 - x0)
+        bits = np.unpackbits(self._npz[f"alphabits_{idx}"], count=count)
+        return (bits.reshape(y1 - y0, x1 - x0) * 255).astype(np.uint8)
+
+    def alpha(self, idx: int) -> np.ndarray:
+        bbox = self.bbox(idx)
+        x0, y0, x1, y1 = bbox
+        out = np.zeros(self.shape, dtype=np.uint8)
+        out[y0:y1, x0:x1] = self._alpha_crop(idx, bbox)
+        return out
+
+    def rgba(self, idx: int) -> np.ndarray:
+        bbox = self.bbox(idx)
+        x0, y0, x1, y1 = bbox
+        crop = self._alpha_crop(idx, bbox)
+        out = np.zeros((*self.shape, 4), dtype=np.uint8)
+        view = out[y0:y1, x0:x1]
+        view[crop > 0, :3] = self._npz[f"rgb_{idx}"]
+        view[:, :, 3] = crop
+        return out
+
+    def layer(self, idx: int) -> LayerOutput:
+        rgba = self.rgba(idx)
+        return LayerOutput(layer_id=self.layer_ids[idx], rgba=rgba, alpha=rgba[:, :, 3].copy())
+
+    def alphas(self) -> list[np.ndarray]:
+        return [self.alpha(idx) for idx in range(len(self))]
+
+
+def load_layer_alphas(path: str | Path) -> list[np.ndarray]:
+    with LayerStore(path) as store:
+        return store.alphas()
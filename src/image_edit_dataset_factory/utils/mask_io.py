@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from image_edit_dataset_factory.core.config import EncoderProfile
+from image_edit_dataset_factory.utils.mask_ops import dilate_mask, ensure_binary, invert_mask
+
+
+def write_binary_mask(
+    path: str | Path, mask: np.ndarray, profile: EncoderProfile | None = None
+) -> None:
+    # Mode "1" PNGs pack 8 pixels per byte; readers converting to "L" get 0/255 back.
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    options = {"compress_level": profile.png_compress_level} if profile is not None else {}
+    Image.fromarray(np.ascontiguousarray(mask > 127)).save(target, **options)
+
+
+def encode_binary_mask(mask: np.ndarray, profile: EncoderProfile | None = None) -> bytes:
+    buffer = io.BytesIO()
+    options = {"compress_level": profile.png_compress_level} if profile is not None else {}
+    Image.fromarray(np.ascontiguousarray(mask > 127)).save(buffer, format="PNG", **options)
+    return buffer.getvalue()
+
+
+def _mask_array(img: Image.Image) -> np.ndarray:
+    if img.mode == "1":
+        return np.asarray(img, dtype=np.uint8) * 255
+    return ensure_binary(np.asarray(img.convert("L")))
+
+
+def read_binary_mask(path: str | Path) -> np.ndarray:
+    with Image.open(path) as img:
+        return _mask_array(img)
+
+
+def decode_binary_mask(data: bytes) -> np.ndarray:
+    with Image.open(io.BytesIO(data)) as img:
+        return _mask_array(img)
+
+
+def is_binary_png(path: str | Path) -> bool:
+    # Mode "1" PNGs are binary by construction, so they can be exported byte-for-byte.
+    try:
+        with Image.open(path) as img:
+            return img.format == "PNG" and img.mode == "1"
+    except OSError:
+        return False
+
+
+def mask_digest(mask: np.ndarray) -> str:
+    packed = np.packbits(mask > 127)
+    digest = hashlib.blake2b(packed.tobytes(), digest_size=16)
+    digest.update(repr(mask.shape).encode())
+    return digest.hexdigest()
+
+
+class MaskCache:
+    """LRU of derived binary masks keyed by source-mask content.
+
+    Entries are kept as packed bits, so a 1024x1024 mask costs 128 KiB.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str, int], tuple[np.ndarray, tuple[int, ...]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _get(
+        self, mask: np.ndarray, op: str, param: int, compute: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        key = (mask_digest(mask), op, param)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            packed, shape = entry
+            count = int(np.prod(shape))
+            return np.unpackbits(packed, count=count).reshape(shape) * np.uint8(255)
+
+        result = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (np.packbits(result > 127), result.shape)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def dilated(self, mask: np.ndarray, pixels: int) -> np.ndarray:
+        return self._get(mask, "dilate", pixels, lambda: dilate_mask(mask, pixels=pixels))
+
+    def inverted(self, mask: np.ndarray) -> np.ndarray:
+        return self._get(mask, "invert", 0, lambda: invert_mask(mask))
+
+
+# Shared by every stage in the process, so generate, export and QA derive each mask once.
+MASK_CACHE = MaskCache()
@@ -5,6 +5,8 @@ from collections.abc import Iterable
 import cv2
 import numpy as np
 
+from image_edit_dataset_factory.utils.tiling import DEFAULT_TILE_SIZE, map_tiles
+
 
 def alpha_to_mask(alpha: np.ndarray, threshold: int = 1) -> np.ndarray:
     if alpha.ndim == 3:
@@ -17,26 +19,55 @@ def ensure_binary(mask: np.ndarray) -> np.ndarray:
     return (mask > 127).astype(np.uint8) * 255
 
 
-def refine_mask(mask: np.ndarray, kernel_size: int = 5, iterations: int = 1) -> np.ndarray:
+def refine_mask(
+    mask: np.ndarray,
+    kernel_size: int = 5,
+    iterations: int = 1,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> np.ndarray:
     kernel = np.ones((kernel_size, kernel_size), dtype=np.uint8)
-    binary = ensure_binary(mask)
-    opened = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel, iterations=iterations)
-    closed = cv2.morphologyEx(opened, cv2.MORPH_CLOSE, kernel, iterations=iterations)
-    return closed
 
+    def _refine(block: np.ndarray) -> np.ndarray:
+        binary = ensure_binary(block)
+        opened = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel, iterations=iterations)
+        return cv2.morphologyEx(opened, cv2.MORPH_CLOSE, kernel, iterations=iterations)
+
+    # Open and close are two erosions and two dilations per iteration.
+    return map_tiles(
+        mask,
+        _refine,
+        halo=4 * (kernel_size // 2) * iterations,
+        tile_size=tile_size,
+        dtype=np.uint8,
+    )
 
-def dilate_mask(mask: np.ndarray, pixels: int = 5) -> np.ndarray:
+
+def dilate_mask(
+    mask: np.ndarray, pixels: int = 5, tile_size: int = DEFAULT_TILE_SIZE
+) -> np.ndarray:
     if pixels <= 0:
         return ensure_binary(mask)
     kernel = np.ones((pixels * 2 + 1, pixels * 2 + 1), dtype=np.uint8)
-    return cv2.dilate(ensure_binary(mask), kernel, iterations=1)
+    return map_tiles(
+        mask,
+        lambda block: cv2.dilate(ensure_binary(block), kernel),
+        halo=pixels,
+        tile_size=tile_size,
+        dtype=np.uint8,
+    )
 
 
-def erode_mask(mask: np.ndarray, pixels: int = 3) -> np.ndarray:
+def erode_mask(mask: np.ndarray, pixels: int = 3, tile_size: int = DEFAULT_TILE_SIZE) -> np.ndarray:
     if pixels <= 0:
         return ensure_binary(mask)
     kernel = np.ones((pixels * 2 + 1, pixels * 2 + 1), dtype=np.uint8)
-    return cv2.erode(ensure_binary(mask), kernel, iterations=1)
+    return map_tiles(
+        mask,
+        lambda block: cv2.erode(ensure_binary(block), kernel),
+        halo=pixels,
+        tile_size=tile_size,
+        dtype=np.uint8,
+    )
 
 
 def invert_mask(mask: np.ndarray) -> np.ndarray:
@@ -82,3 +113,23 @@ def edge_error_px(pred_mask: np.ndarray, ref_mask: np.ndarray) -> float:
     if values.size == 0:
         return float(max(pred.shape))
     return float(np.mean(values))
+
+
+def roi_bbox(mask: np.ndarray, margin: int, min_size: int) -> tuple[int, int, int, int] | None:
+    """Mask bbox grown by `margin` and to at least `min_size` per side, clamped to the image.
+
+    Returns x0, y0, x1, y1 with exclusive ends, or None for an empty mask.
+    """
+    bbox = bbox_from_mask(mask)
+    if bbox is None:
+        return None
+    h, w = mask.shape[:2]
+    x0, y0, x1, y1 = bbox
+    spans = []
+    for lo, hi, limit in ((x0 - margin, x1 + 1 + margin, w), (y0 - margin, y1 + 1 + margin, h)):
+        size = min(limit, max(hi - lo, min_size))
+        center = (lo + hi) // 2
+        start = min(max(0, center - size // 2), limit - size)
+        spans.append((start, start + size))
+    (rx0, rx1), (ry0, ry1) = spans
+    return rx0, ry0, rx1, ry1
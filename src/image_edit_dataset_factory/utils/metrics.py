@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import cv2
 import numpy as np
 from skimage.metrics import structural_similarity
 
+from image_edit_dataset_factory.utils.tiling import DEFAULT_TILE_SIZE, iter_tiles
+
+SSIM_WIN_SIZE = 7
+# The SSIM map needs about ten float64 temporaries per tile, so it uses smaller tiles than
+# the uint8 paths to keep its working set to a few tens of MiB.
+SSIM_TILE_SIZE = 512
+
 
 def mse(image_a: np.ndarray, image_b: np.ndarray) -> float:
     diff = image_a.astype(np.float32) - image_b.astype(np.float32)
@@ -27,3 +35,90 @@ def ssim_rgb(image_a: np.ndarray, image_b: np.ndarray) -> float:
             data_range=255,
         )
     )
+
+
+def masked_diff_stats(
+    image_a: np.ndarray,
+    image_b: np.ndarray,
+    region: np.ndarray,
+    threshold: int = 2,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> tuple[float, float]:
+    """MSE and changed-pixel ratio over `region`, accumulated tile by tile.
+
+    Works on uint8 views only: cv2.norm sums squared differences under the mask and
+    cv2.absdiff stays in uint8, so no float or widened copies of the images are made.
+    """
+    count = 0
+    sq_sum = 0.0
+    changed = 0
+    for tile in iter_tiles(image_a.shape, tile_size):
+        selected = region[tile.core]
+        n = int(np.count_nonzero(selected))
+        if n == 0:
+            continue
+        block_a = image_a[tile.core]
+        block_b = image_b[tile.core]
+        count += n
+        sq_sum += cv2.norm(block_a, block_b, cv2.NORM_L2SQR, mask=selected.view(np.uint8))
+        over = cv2.absdiff(block_a, block_b).max(axis=-1) > threshold
+        changed += int(np.count_nonzero(over & selected))
+    if count == 0:
+        return 0.0, 0.0
+    return sq_sum / (count * image_a.shape[-1]), changed / count
+
+
+def _ssim_map(block_a: np.ndarray, block_b: np.ndarray) -> np.ndarray:
+    # Mirrors skimage's defaults: 7x7 uniform window, sample covariance, data_range=255.
+    a = block_a.astype(np.float64)
+    b = block_b.astype(np.float64)
+    size = (SSIM_WIN_SIZE, SSIM_WIN_SIZE)
+
+    def blur(x: np.ndarray) -> np.ndarray:
+        return cv2.boxFilter(x, -1, size, borderType=cv2.BORDER_REFLECT)
+
+    cov_norm = SSIM_WIN_SIZE**2 / (SSIM_WIN_SIZE**2 - 1)
+    ux, uy = blur(a), blur(b)
+    vx = cov_norm * (blur(a * a) - ux * ux)
+    vy = cov_norm * (blur(b * b) - uy * uy)
+    vxy = cov_norm * (blur(a * b) - ux * uy)
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    return ((2 * ux * uy + c1) * (2 * vxy + c2)) / ((ux**2 + uy**2 + c1) * (vx + vy + c2))
+
+
+def ssim_rgb_tiled(
+    image_a: np.ndarray,
+    image_b: np.ndarray,
+    ignore: np.ndarray | None = None,
+    tile_size: int = SSIM_TILE_SIZE,
+) -> float:
+    """Same value as `ssim_rgb` without materialising full-frame float64 maps.
+
+    Pixels set in `ignore` take `image_b`'s value in `image_a`, so they compare as identical.
+    """
+    if image_a.shape != image_b.shape:
+        msg = "Images must have same shape"
+        raise ValueError(msg)
+    h, w = image_a.shape[:2]
+    pad = SSIM_WIN_SIZE // 2
+    total = 0.0
+    count = 0
+    for tile in iter_tiles(image_a.shape, tile_size, halo=pad):
+        block_a = image_a[tile.padded]
+        block_b = image_b[tile.padded]
+        if ignore is not None:
+            block_a = np.where(ignore[tile.padded][..., None], block_b, block_a)
+        ys, xs = tile.core
+        iy, ix = tile.inner
+        # skimage averages over the map with a `pad`-wide frame cropped off.
+        y0, y1 = max(ys.start, pad), min(ys.stop, h - pad)
+        x0, x1 = max(xs.start, pad), min(xs.stop, w - pad)
+        if y0 >= y1 or x0 >= x1:
+            continue
+        ssim = _ssim_map(block_a, block_b)
+        oy, ox = iy.start - ys.start, ix.start - xs.start
+        window = ssim[y0 + oy : y1 + oy, x0 + ox : x1 + ox]
+        total += float(window.sum())
+        count += window.size
+    return total / count if count else 1.0
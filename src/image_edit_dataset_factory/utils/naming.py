@@ -1,20 +1,32 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from pathlib import Path
 
+# Delivery contract: zero-padded 5-digit ids. Wider ids are opt-in via export.id_width.
+DEFAULT_ID_WIDTH = 5
 ID_PATTERN = re.compile(r"^\d{5}$")
 
 
-def format_sample_id(index: int) -> str:
+@lru_cache(maxsize=8)
+def id_pattern(width: int = DEFAULT_ID_WIDTH) -> re.Pattern[str]:
+    return re.compile(rf"^\d{{{width}}}$")
+
+
+def format_sample_id(index: int, width: int = DEFAULT_ID_WIDTH) -> str:
     if index < 0:
         msg = "index must be >= 0"
         raise ValueError(msg)
-    return f"{index:05d}"
+    sample_id = f"{index:0{width}d}"
+    if len(sample_id) > width:
+        msg = f"index {index} does not fit in {width} digits"
+        raise ValueError(msg)
+    return sample_id
 
 
-def validate_sample_id(sample_id: str) -> bool:
-    return bool(ID_PATTERN.match(sample_id))
+def validate_sample_id(sample_id: str, width: int = DEFAULT_ID_WIDTH) -> bool:
+    return bool(id_pattern(width).match(sample_id))
 
 
 def source_image_name(sample_id: str) -> str:
@@ -39,13 +51,14 @@ def mask_name(sample_id: str, index: int | None = None) -> str:
     return f"{sample_id}_mask-{index}.png"
 
 
-def next_id_from_dataset_root(dataset_root: str | Path) -> int:
+def next_id_from_dataset_root(dataset_root: str | Path, width: int = DEFAULT_ID_WIDTH) -> int:
+    """Full-tree scan; only used to seed utils.id_allocator for datasets that predate it."""
     root = Path(dataset_root)
     max_id = 0
     for path in root.rglob("*.jpg"):
         stem = path.stem
         if stem.endswith("_result"):
             stem = stem[: -len("_result")]
-        if validate_sample_id(stem):
+        if validate_sample_id(stem, width):
             max_id = max(max_id, int(stem))
     return max_id + 1
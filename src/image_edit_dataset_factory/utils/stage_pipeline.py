@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+LoadedT = TypeVar("LoadedT")
+InferredT = TypeVar("InferredT")
+R = TypeVar("R")
+
+
+@dataclass
+class StageTimings:
+    items: int = 0
+    load_sec: float = 0.0
+    infer_sec: float = 0.0
+    write_sec: float = 0.0
+    # Time the infer stage sat idle waiting for the next load to finish.
+    infer_wait_sec: float = 0.0
+    wall_sec: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            setattr(self, f"{stage}_sec", getattr(self, f"{stage}_sec") + seconds)
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "items": self.items,
+            "load_sec": round(self.load_sec, 4),
+            "infer_sec": round(self.infer_sec, 4),
+            "write_sec": round(self.write_sec, 4),
+            "infer_wait_sec": round(self.infer_wait_sec, 4),
+            "wall_sec": round(self.wall_sec, 4),
+        }
+
+    def log_fields(self) -> str:
+        return " ".join(f"{key}={value}" for key, value in self.as_dict().items())
+
+
+@dataclass
+class StagedResult(Generic[R]):
+    results: list[R]
+    timings: StageTimings
+
+
+def _timed(timings: StageTimings, stage: str, fn: Callable[..., Any], *args: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings.add(stage, time.perf_counter() - start)
+
+
+def run_staged(
+    items: Sequence[T],
+    load: Callable[[T], LoadedT],
+    infer: Callable[[T, LoadedT], InferredT],
+    write: Callable[[T, LoadedT, InferredT], R],
+    io_workers: int = 2,
+    queue_size: int = 2,
+) -> StagedResult[R]:
+    """Runs load -> infer -> write with I/O on worker threads around a single infer stage.
+
+    `infer` always runs on the calling thread, one item at a time, so a model that is not
+    thread-safe is never entered concurrently. Loads are fed through a bounded queue and
+    in-flight writes are capped at `queue_size`, which keeps memory flat. Results come
+    back in input order.
+    """
+    timings = StageTimings(items=len(items))
+    wall_start = time.perf_counter()
+
+    if io_workers <= 0:
+        results = []
+        for item in items:
+            loaded = _timed(timings, "load", load, item)
+            inferred = _timed(timings, "infer", infer, item, loaded)
+            results.append(_timed(timings, "write", write, item, loaded, inferred))
+        timings.wall_sec = time.perf_counter() - wall_start
+        return StagedResult(results=results, timings=timings)
+
+    queue_size = max(1, queue_size)
+    loaded_queue: queue.Queue[Future[LoadedT]] = queue.Queue(maxsize=queue_size)
+    write_slots = threading.BoundedSemaphore(queue_size)
+    stop = threading.Event()
+    writes: list[Future[R]] = []
+
+    with (
+        ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="stage-load") as load_pool,
+        ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="stage-write") as write_pool,
+    ):
+
+        def _feed() -> None:
+            for item in items:
+                if stop.is_set():
+                    return
+                loaded_queue.put(load_pool.submit(_timed, timings, "load", load, item))
+
+        feeder = threading.Thread(target=_feed, name="stage-feed", daemon=True)
+        feeder.start()
+        try:
+            for item in items:
+                wait_start = time.perf_counter()
+                loaded = loaded_queue.get().result()
+                timings.infer_wait_sec += time.perf_counter() - wait_start
+
+                inferred = _timed(timings, "infer", infer, item, loaded)
+
+                write_slots.acquire()
+                future = write_pool.submit(_timed, timings, "write", write, item, loaded, inferred)
+                future.add_done_callback(lambda _: write_slots.release())
+                writes.append(future)
+            results = [future.result() for future in writes]
+        except BaseException:
+            stop.set()
+            while feeder.is_alive():
+                try:
+                    loaded_queue.get_nowait()
+                except queue.Empty:
+                    feeder.join(timeout=0.01)
+            raise
+        feeder.join()
+
+    timings.wall_sec = time.perf_counter() - wall_start
+    return StagedResult(results=results, timings=timings)
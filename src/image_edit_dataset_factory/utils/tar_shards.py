@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import io
+import tarfile
+from pathlib import Path
+from types import TracebackType
+
+TAR_BLOCK = 512
+SHARD_NAME = "shard-{:06d}.tar"
+
+
+def shard_name(index: int) -> str:
+    return SHARD_NAME.format(index)
+
+
+def padded_size(size: int) -> int:
+    return -(-size // TAR_BLOCK) * TAR_BLOCK
+
+
+class ShardWriter:
+    """Appends in-memory members to one uncompressed tar and records where each payload lands.
+
+    Offsets are byte positions of the member data inside the tar, so a reader can `seek` and
+    `read(size)` a single member without parsing headers. Headers carry a zero mtime and no
+    owner, which makes shard bytes reproducible.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tar = tarfile.open(self.path, "w", format=tarfile.USTAR_FORMAT)
+
+    def add(self, name: str, data: bytes) -> tuple[int, int]:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        start = self._tar.offset
+        self._tar.addfile(info, io.BytesIO(data))
+        header = self._tar.offset - start - padded_size(len(data))
+        return start + header, len(data)
+
+    @property
+    def size(self) -> int:
+        return self._tar.offset
+
+    def close(self) -> None:
+        self._tar.close()
+
+    def __enter__(self) -> ShardWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def read_member(path: str | Path, offset: int, size: int) -> bytes:
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        return handle.read(size)
+
+
+def plan_shards(sizes: list[int], max_bytes: int, max_samples: int) -> list[list[int]]:
+    """Split consecutive items into groups under both limits; an oversized item gets its own."""
+    groups: list[list[int]] = []
+    current: list[int] = []
+    current_bytes = 0
+    for idx, size in enumerate(sizes):
+        if current and (current_bytes + size > max_bytes or len(current) >= max_samples):
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append(idx)
+        current_bytes += size
+    if current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+
+from image_edit_dataset_factory.utils.color_lut import (
+    apply_luts,
+    color_tone_table,
+    style_table,
+    style_variant_chains,
+)
+
+
+def test_color_tone_lut_matches_float_path_inside_region_only() -> None:
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)
+    region = rng.random((40, 50)) > 0.5
+
+    expected = image.astype(np.float32)
+    expected[region, 0] *= 1.03
+    expected[region, 2] *= 0.97
+    expected = np.clip(expected, 0, 255).astype(np.uint8)
+
+    out = apply_luts(image, color_tone_table(0.03), region=region)
+    assert np.array_equal(out, expected)
+    assert np.array_equal(out[~region], image[~region])
+
+
+def test_style_chain_matches_sequential_float_ops() -> None:
+    rng = np.random.default_rng(1)
+    image = rng.integers(0, 256, (32, 48, 3), dtype=np.uint8)
+
+    contrast = np.clip((image.astype(np.float32) - 127.5) * 1.25 + 127.5, 0, 255).astype(np.uint8)
+    brightened = np.clip(contrast.astype(np.int16) + 20, 0, 255).astype(np.uint8)
+    toned = brightened.astype(np.float32)
+    toned[:, :, 0] *= 1.08
+    toned[:, :, 2] *= 0.92
+    expected = np.clip(toned, 0, 255).astype(np.uint8)
+
+    chain = (("contrast", 1.25), ("brightness", 20), ("color_tone", 0.08))
+    buffer = np.empty_like(image)
+    out = apply_luts(image, style_table(chain), out=buffer)
+    assert out is buffer
+    assert np.array_equal(out, expected)
+    assert style_table(chain) is style_table(chain)
+
+
+def test_style_variant_chains_grid() -> None:
+    chains = style_variant_chains(
+        ["contrast", "color_tone"], {"contrast": [1.1, 1.3], "color_tone": [-0.05, 0.0, 0.05]}
+    )
+    assert len(chains) == 6
+    assert chains[0] == (("contrast", 1.1), ("color_tone", -0.05))
+    assert len({style_table(chain).tobytes() for chain in chains}) == 6
@@ -0,0 +1,233 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_edit_dataset_factory.backends.api_service_backends import ApiLayeredDecomposer
+from image_edit_dataset_factory.backends.mock_backend import MockLayeredDecomposer
+from image_edit_dataset_factory.backends.qwen_layered_modelscope import (
+    QwenLayeredModelScopeBackend,
+)
+from image_edit_dataset_factory.clients.layered_client import LayeredServiceClient
+from image_edit_dataset_factory.clients.serialization import (
+    encode_mask_png_base64,
+    encode_rgba_png_base64,
+)
+from image_edit_dataset_factory.core.config import (
+    AppConfig,
+    EncoderProfile,
+    ServiceEndpointConfig,
+)
+from image_edit_dataset_factory.core.schema import SourceSample
+from image_edit_dataset_factory.pipeline.decompose import (
+    _infer_layers,
+    _load_source,
+    _select_primary_mask,
+    _write_outputs,
+    run_decompose,
+)
+from image_edit_dataset_factory.pipeline.decompose_executor import (
+    DecomposeExecutor,
+    resolve_policy,
+)
+from image_edit_dataset_factory.pipeline.ingest import run_ingest
+from image_edit_dataset_factory.utils.image_io import read_mask
+from image_edit_dataset_factory.utils.jsonl import read_jsonl
+from image_edit_dataset_factory.utils.layer_store import load_layer_alphas
+
+
+def test_select_primary_mask_picks_smallest_in_band_layer() -> None:
+    background = np.full((100, 100), 255, dtype=np.uint8)
+    speck = np.zeros((100, 100), dtype=np.uint8)
+    speck[0:2, 0:2] = 255
+    large = np.zeros((100, 100), dtype=np.uint8)
+    large[10:60, 10:60] = 255
+    small = np.zeros((100, 100), dtype=np.uint8)
+    small[70:90, 70:90] = 200
+
+    mask = _select_primary_mask((100, 100), [background, speck, large, small])
+    assert mask[80, 80] == 255
+    assert mask[30, 30] == 0
+
+
+def test_select_primary_mask_falls_back_to_center_box() -> None:
+    full = np.full((40, 80), 255, dtype=np.uint8)
+    mask = _select_primary_mask((40, 80), [full, full.copy()])
+    assert mask[20, 40] == 255
+    assert mask[0, 0] == 0
+
+
+def _slow_load(item: int) -> int:
+    # Earlier items finish last so any unordered collection would show up.
+    time.sleep((8 - item) * 0.01)
+    return item * 10
+
+
+def _echo_infer(backend: object, item: int, loaded: int) -> int:
+    _ = backend
+    return loaded + 1
+
+
+def _pair_write(item: int, loaded: int, inferred: int) -> tuple[int, int, int]:
+    time.sleep((8 - item) * 0.005)
+    return item, loaded, inferred
+
+
+def test_resolve_policy_per_backend() -> None:
+    mock = MockLayeredDecomposer()
+    api = ApiLayeredDecomposer(ServiceEndpointConfig(endpoint="http://test-layered"))
+    qwen = QwenLayeredModelScopeBackend(model_dir=None)
+
+    assert resolve_policy(mock, "auto", num_workers=4, item_count=64) == "process"
+    assert resolve_policy(mock, "auto", num_workers=4, item_count=3) == "serial"
+    assert resolve_policy(api, "auto", num_workers=4, item_count=64) == "serial"
+    assert resolve_policy(api, "thread", num_workers=4, item_count=64) == "thread"
+    assert resolve_policy(qwen, "auto", num_workers=4, item_count=64) == "gpu"
+
+
+def test_resolve_policy_single_worker_downgrades_to_serial() -> None:
+    mock = MockLayeredDecomposer()
+    assert resolve_policy(mock, "process", num_workers=1, item_count=64) == "serial"
+    assert resolve_policy(mock, "thread", num_workers=1, item_count=64) == "serial"
+    assert resolve_policy(mock, "gpu", num_workers=1, item_count=64) == "gpu"
+
+
+def test_executor_rejects_unknown_policy() -> None:
+    with pytest.raises(ValueError):
+        DecomposeExecutor(MockLayeredDecomposer(), policy="fork")
+
+
+@pytest.mark.parametrize("policy", ["serial", "process", "thread", "gpu"])
+def test_executor_preserves_input_order(policy: str) -> None:
+    executor = DecomposeExecutor(MockLayeredDecomposer(), policy=policy, num_workers=4)
+    items = list(range(8))
+    results = executor.run(items, load=_slow_load, infer=_echo_infer, write=_pair_write)
+    assert results == [(item, item * 10, item * 10 + 1) for item in items]
+
+
+def _layered_handler(request: httpx.Request) -> httpx.Response:
+    _ = request
+    rgba = np.zeros((32, 32, 4), dtype=np.uint8)
+    rgba[8:24, 8:24] = [200, 50, 50, 255]
+    body = {
+        "request_id": "r1",
+        "runtime": "mock",
+        "width": 32,
+        "height": 32,
+        "layers": [
+            {
+                "layer_id": 0,
+                "rgba_b64": encode_rgba_png_base64(rgba),
+                "alpha_b64": encode_mask_png_base64(rgba[:, :, 3]),
+            }
+        ],
+    }
+    return httpx.Response(status_code=200, json=body)
+
+
+def test_thread_policy_with_api_backend_completes(tmp_path: Path) -> None:
+    endpoint = ServiceEndpointConfig(endpoint="http://test-layered", max_retries=0, backoff_sec=0)
+    backend = ApiLayeredDecomposer(endpoint)
+    backend.client = LayeredServiceClient(endpoint, transport=httpx.MockTransport(_layered_handler))
+
+    sources = []
+    for idx in range(6):
+        image_path = tmp_path / f"img_{idx}.png"
+        Image.fromarray(np.zeros((32, 32, 3), dtype=np.uint8)).save(image_path)
+        sources.append(
+            SourceSample(
+                source_id=f"src_{idx}",
+                dataset_category="物体一致性",
+                image_path=str(image_path),
+                width=32,
+                height=32,
+            )
+        )
+
+    executor = DecomposeExecutor(backend, policy="thread", num_workers=3)
+    with ThreadPoolExecutor(max_workers=1) as guard:
+        future = guard.submit(
+            executor.run,
+            sources,
+            load=partial(_load_source, decode=False),
+            infer=partial(_infer_layers, from_path=True),
+            write=partial(
+                _write_outputs,
+                out_dir=tmp_path / "out",
+                layer_format="png",
+                encoder=EncoderProfile(),
+            ),
+        )
+        records = future.result(timeout=30)
+
+    assert [record["source_id"] for record in records] == [s.source_id for s in sources]
+    assert all(Path(str(record["mask_path"])).exists() for record in records)
+
+
+def _mock_decompose_cfg(tmp_path: Path, layer_format: str, resume: bool = False) -> AppConfig:
+    folder = tmp_path / "data" / "物体一致性" / "case_001"
+    folder.mkdir(parents=True, exist_ok=True)
+    arr = np.zeros((128, 128, 3), dtype=np.uint8)
+    arr[:, :] = [70, 120, 180]
+    arr[40:90, 40:90] = [220, 80, 90]
+    Image.fromarray(arr).save(folder / "img.jpg", quality=95)
+
+    return AppConfig.model_validate(
+        {
+            "paths": {
+                "project_root": str(tmp_path),
+                "data_root": "./data",
+                "output_root": f"./outputs_{layer_format}",
+                "logs_root": "./logs",
+            },
+            "ingest": {"include_categories": ["物体一致性"], "recursive": True},
+            "filter": {"enabled": False},
+            "backends": {"layered_backend": "mock", "use_modelscope": False},
+            "pipeline": {"resume": resume},
+            "decompose": {"layer_format": layer_format, "executor": "serial"},
+        }
+    )
+
+
+def test_run_decompose_npz_layer_store(tmp_path: Path) -> None:
+    png_cfg = _mock_decompose_cfg(tmp_path, "png")
+    run_ingest(png_cfg)
+    png_row = read_jsonl(run_decompose(png_cfg))[0]
+
+    npz_cfg = _mock_decompose_cfg(tmp_path, "npz")
+    run_ingest(npz_cfg)
+    npz_row = read_jsonl(run_decompose(npz_cfg))[0]
+
+    assert npz_row["layer_paths"] == []
+    assert npz_row["layer_store_path"]
+    expected = MockLayeredDecomposer().decompose(
+        np.asarray(Image.open(npz_row["image_path"]).convert("RGB"))
+    )
+    alphas = load_layer_alphas(npz_row["layer_store_path"])
+    assert len(alphas) == len(expected)
+    for alpha, layer in zip(alphas, expected, strict=True):
+        np.testing.assert_array_equal(alpha, layer.alpha)
+    np.testing.assert_array_equal(read_mask(npz_row["mask_path"]), read_mask(png_row["mask_path"]))
+
+
+def test_run_decompose_resume_reuses_layer_store(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cfg = _mock_decompose_cfg(tmp_path, "npz")
+    run_ingest(cfg)
+    first = read_jsonl(run_decompose(cfg))[0]
+
+    def _fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("backend should not run for stored sources")
+
+    monkeypatch.setattr(MockLayeredDecomposer, "decompose", _fail)
+    resumed_cfg = cfg.model_copy(
+        update={"pipeline": cfg.pipeline.model_copy(update={"resume": True})}
+    )
+    second = read_jsonl(run_decompose(resumed_cfg))[0]
+    assert second == first
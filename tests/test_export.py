@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import tarfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_edit_dataset_factory.core.config import AppConfig
+from image_edit_dataset_factory.core.paths import resolve_paths
+from image_edit_dataset_factory.core.schema import SampleRecord
+from image_edit_dataset_factory.pipeline.decompose import run_decompose
+from image_edit_dataset_factory.pipeline.export import run_export
+from image_edit_dataset_factory.pipeline.generate_samples import run_generate
+from image_edit_dataset_factory.pipeline.index_writer import IndexSink, load_id_map
+from image_edit_dataset_factory.pipeline.ingest import run_ingest
+from image_edit_dataset_factory.pipeline.qa_step import run_qa
+from image_edit_dataset_factory.pipeline.shard_export import (
+    SHARD_DIR_NAME,
+    load_shard_index,
+    read_shard_member,
+)
+from image_edit_dataset_factory.utils.file_ops import materialize
+from image_edit_dataset_factory.utils.jsonl import read_jsonl
+
+CATEGORIES = ["人物物体一致性", "物体一致性", "物理变化"]
+
+
+def _export_cfg(tmp_path: Path, **export: object) -> AppConfig:
+    for category in CATEGORIES:
+        folder = tmp_path / "data" / category / "case_000"
+        folder.mkdir(parents=True, exist_ok=True)
+        arr = np.zeros((96, 96, 3), dtype=np.uint8)
+        arr[:, :] = [70, 120, 180]
+        arr[30:70, 30:70] = [220, 80, 90]
+        Image.fromarray(arr).save(folder / "img.jpg", quality=95)
+
+    return AppConfig.model_validate(
+        {
+            "paths": {"project_root": str(tmp_path)},
+            "ingest": {"include_categories": CATEGORIES, "recursive": True},
+            "filter": {"enabled": False},
+            "backends": {"layered_backend": "mock", "edit_backend": "opencv"},
+            "decompose": {"executor": "serial"},
+            "export": export,
+        }
+    )
+
+
+def _prepare(cfg: AppConfig) -> list[dict[str, object]]:
+    run_ingest(cfg)
+    run_decompose(cfg)
+    return read_jsonl(run_generate(cfg))
+
+
+@pytest.mark.parametrize("transfer", ["copy", "hardlink"])
+def test_export_transfers_staged_bytes(tmp_path: Path, transfer: str) -> None:
+    cfg = _export_cfg(tmp_path, transfer=transfer)
+    staged = _prepare(cfg)
+    exported = read_jsonl(run_export(cfg))
+
+    for before, after in zip(staged, exported, strict=True):
+        for key in ("src_image_path", "result_image_path"):
+            src, dst = Path(str(before[key])), Path(str(after[key]))
+            assert dst.read_bytes() == src.read_bytes()
+            assert src.samefile(dst) == (transfer == "hardlink")
+        mask_paths = [Path(str(path)) for path in after["mask_paths"]]
+        assert mask_paths[0].read_bytes() == Path(str(before["mask_paths"][0])).read_bytes()
+        with Image.open(mask_paths[1]) as mask1:
+            assert mask1.mode == "1"
+
+
+def test_export_transcodes_by_default(tmp_path: Path) -> None:
+    cfg = _export_cfg(tmp_path)
+    staged = _prepare(cfg)
+    exported = read_jsonl(run_export(cfg))
+
+    # The export profile re-encodes with optimize on, so the bytes differ from staging.
+    src = Path(str(staged[0]["result_image_path"])).read_bytes()
+    assert Path(str(exported[0]["result_image_path"])).read_bytes() != src
+
+
+def test_materialize_auto_never_hardlinks(tmp_path: Path) -> None:
+    src = tmp_path / "a.bin"
+    src.write_bytes(b"payload")
+    dst = tmp_path / "out" / "b.bin"
+
+    method = materialize(src, dst, "auto")
+
+    assert method in {"reflink", "copy"}
+    assert dst.read_bytes() == b"payload"
+    assert not src.samefile(dst)
+    with pytest.raises(ValueError):
+        materialize(src, dst, "symlink")
+
+
+def _dataset_bytes(cfg: AppConfig) -> dict[Path, bytes]:
+    root = resolve_paths(cfg).dataset_dir
+    return {path.relative_to(root): path.read_bytes() for path in root.rglob("*") if path.is_file()}
+
+
+def test_parallel_export_matches_serial(tmp_path: Path) -> None:
+    cfg = _export_cfg(tmp_path, workers=1)
+    _prepare(cfg)
+    serial = run_export(cfg).read_text(encoding="utf-8")
+    serial_files = _dataset_bytes(cfg)
+
+    cfg.export.workers = 4
+    parallel = run_export(cfg).read_text(encoding="utf-8")
+
+    assert serial_files
+    assert parallel == serial
+    assert _dataset_bytes(cfg) == serial_files
+
+
+def test_resumed_export_appends_only_new_samples(tmp_path: Path) -> None:
+    cfg = _export_cfg(tmp_path)
+    cfg.pipeline.resume = True
+    _prepare(cfg)
+    first = read_jsonl(run_export(cfg))
+    first_mtimes = {
+        row["sample_id"]: Path(str(row["src_image_path"])).stat().st_mtime_ns for row in first
+    }
+
+    extra = tmp_path / "data" / CATEGORIES[0] / "case_001"
+    extra.mkdir(parents=True)
+    arr = np.full((96, 96, 3), 200, dtype=np.uint8)
+    arr[20:60, 20:60] = [10, 90, 30]
+    Image.fromarray(arr).save(extra / "img.jpg", quality=95)
+    _prepare(cfg)
+    index = read_jsonl(run_export(cfg))
+
+    assert index[: len(first)] == first
+    added = index[len(first) :]
+    assert [row["sample_id"] for row in added] == [f"{len(first) + 1:05d}"]
+    assert added[0]["source_id"] not in {row["source_id"] for row in first}
+    for row in first:
+        assert Path(str(row["src_image_path"])).stat().st_mtime_ns == first_mtimes[row["sample_id"]]
+
+    id_map = read_jsonl(resolve_paths(cfg).reports_dir / "id_map.jsonl")
+    assert [row["sample_id"] for row in id_map] == [row["sample_id"] for row in index]
+    csv_lines = (resolve_paths(cfg).reports_dir / "index.csv").read_text(encoding="utf-8")
+    assert csv_lines.count("sample_id,") == 1
+
+
+def test_shard_export_writes_indexed_contiguous_samples(tmp_path: Path) -> None:
+    cfg = _export_cfg(tmp_path, layout="shards", shard_max_samples=2, workers=2)
+    _prepare(cfg)
+    exported = read_jsonl(run_export(cfg))
+
+    shard_dir = resolve_paths(cfg).dataset_dir / SHARD_DIR_NAME
+    rows = load_shard_index(shard_dir)
+    assert [row["sample_id"] for row in rows] == [row["sample_id"] for row in exported]
+    assert sorted(path.name for path in shard_dir.glob("*.tar")) == [
+        "shard-000000.tar",
+        "shard-000001.tar",
+    ]
+
+    with tarfile.open(shard_dir / "shard-000000.tar") as tar:
+        keys = [member.name.split(".", 1)[0] for member in tar.getmembers()]
+        # Members of one sample sit next to each other, as WebDataset readers expect.
+        assert keys == sorted(keys)
+        src = tar.extractfile(f"{rows[0]['sample_id']}.jpg")
+        assert src is not None
+        assert read_shard_member(shard_dir, rows[0], "jpg") == src.read()
+    assert set(rows[0]["members"]) >= {"jpg", "result.jpg", "ch.txt", "en.txt", "json"}
+
+    summary = run_qa(cfg)
+    assert summary["lint_issue_count"] == 0
+    qa_rows = Path(str(summary["qa_csv"])).read_text(encoding="utf-8").splitlines()
+    assert len(qa_rows) == len(exported) + 1
+
+
+def test_index_sink_replaces_index_only_on_commit(tmp_path: Path) -> None:
+    cfg = _export_cfg(tmp_path)
+    _prepare(cfg)
+    index_jsonl = run_export(cfg)
+    reports_dir = index_jsonl.parent
+    before = {name: (reports_dir / name).read_bytes() for name in ("index.csv", "index.jsonl")}
+    record = SampleRecord.model_validate(read_jsonl(index_jsonl)[0])
+
+    sink = IndexSink(reports_dir, append=True)
+    sink.write(record.model_copy(update={"sample_id": "99999"}), key="extra")
+    sink.abort()
+    assert {name: (reports_dir / name).read_bytes() for name in before} == before
+    assert not list(reports_dir.glob("*.tmp"))
+
+    sink = IndexSink(reports_dir, append=True)
+    sink.write(record.model_copy(update={"sample_id": "99999"}), key="extra")
+    sink.commit()
+    rows = read_jsonl(index_jsonl)
+    assert rows[-1]["sample_id"] == "99999"
+    assert len(rows) == len(before["index.jsonl"].splitlines()) + 1
+    assert (reports_dir / "index.csv").read_bytes().startswith(before["index.csv"])
+    assert load_id_map(reports_dir)["extra"] == "99999"
@@ -0,0 +1,177 @@
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_edit_dataset_factory.backends.edit_base import EditorBackend
+from image_edit_dataset_factory.core.config import AppConfig, StructuralVariantConfig
+from image_edit_dataset_factory.core.schema import SourceSample
+from image_edit_dataset_factory.pipeline import generate_samples
+from image_edit_dataset_factory.pipeline.decompose import run_decompose
+from image_edit_dataset_factory.pipeline.generate.base import GenerationContext, PreparedSample
+from image_edit_dataset_factory.pipeline.generate.structural import StructuralGenerator
+from image_edit_dataset_factory.pipeline.generate_samples import run_generate
+from image_edit_dataset_factory.pipeline.ingest import run_ingest
+from image_edit_dataset_factory.utils.jsonl import read_jsonl
+from image_edit_dataset_factory.utils.mask_ops import dilate_mask
+
+CATEGORIES = ["人物物体一致性", "物体一致性", "物理变化"]
+
+
+def _generate_cfg(tmp_path: Path, output_root: str, **generate: object) -> AppConfig:
+    for category in CATEGORIES:
+        for idx in range(3):
+            folder = tmp_path / "data" / category / f"case_{idx:03d}"
+            folder.mkdir(parents=True, exist_ok=True)
+            arr = np.zeros((96, 96, 3), dtype=np.uint8)
+            arr[:, :] = [70 + idx * 10, 120, 180]
+            arr[30:70, 30:70] = [220, 80, 90]
+            Image.fromarray(arr).save(folder / "img.jpg", quality=95)
+
+    return AppConfig.model_validate(
+        {
+            "paths": {
+                "project_root": str(tmp_path),
+                "data_root": "./data",
+                "output_root": output_root,
+                "logs_root": "./logs",
+            },
+            "ingest": {"include_categories": CATEGORIES, "recursive": True},
+            "filter": {"enabled": False},
+            "backends": {"layered_backend": "mock", "edit_backend": "opencv"},
+            "decompose": {"executor": "serial"},
+            "generate": generate,
+        }
+    )
+
+
+def _run(cfg: AppConfig) -> list[dict[str, object]]:
+    run_ingest(cfg)
+    run_decompose(cfg)
+    return read_jsonl(run_generate(cfg))
+
+
+def test_parallel_generate_matches_serial_order(tmp_path: Path) -> None:
+    serial_cfg = _generate_cfg(tmp_path, "./serial", workers_per_task={}, io_workers=0)
+    parallel_cfg = _generate_cfg(
+        tmp_path,
+        "./parallel",
+        workers_per_task={"consistency_edit": 3, "structural_edit": 2},
+    )
+
+    serial = _run(serial_cfg)
+    parallel = _run(parallel_cfg)
+
+    assert [row["source_id"] for row in parallel] == [row["source_id"] for row in serial]
+    assert [row["edit_task"] for row in parallel] == [row["edit_task"] for row in serial]
+    for left, right in zip(serial, parallel, strict=True):
+        left_img = np.asarray(Image.open(str(left["result_image_path"])))
+        right_img = np.asarray(Image.open(str(right["result_image_path"])))
+        np.testing.assert_array_equal(left_img, right_img)
+
+
+class _RecordingBackend(EditorBackend):
+    def __init__(self) -> None:
+        self.calls: list[tuple[str | None, int]] = []
+
+    def inpaint(
+        self, image_rgb: np.ndarray, mask: np.ndarray, prompt: str | None = None
+    ) -> np.ndarray:
+        return image_rgb.copy()
+
+    def inpaint_batch(
+        self,
+        images_rgb: Sequence[np.ndarray],
+        masks: Sequence[np.ndarray],
+        prompt: str | None = None,
+    ) -> list[np.ndarray]:
+        self.calls.append((prompt, len(images_rgb)))
+        return [image.copy() for image in images_rgb]
+
+
+def test_generate_groups_backend_calls_by_task(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backend = _RecordingBackend()
+    monkeypatch.setattr(generate_samples, "build_edit_backend", lambda cfg: backend)
+    cfg = _generate_cfg(tmp_path, "./grouped", batch_size=2)
+
+    rows = _run(cfg)
+
+    prompts = [prompt for prompt, _ in backend.calls]
+    assert prompts == ["delete object", "delete object", "repair hole", "repair hole"]
+    assert [size for _, size in backend.calls] == [2, 1, 2, 1]
+    assert [row["source_id"] for row in rows] == sorted(str(row["source_id"]) for row in rows)
+    assert {row["edit_task"] for row in rows} == {
+        "consistency_edit",
+        "semantic_edit",
+        "structural_edit",
+    }
+
+
+def test_variants_share_inpaint_calls(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = _RecordingBackend()
+    monkeypatch.setattr(generate_samples, "build_edit_backend", lambda cfg: backend)
+    cfg = _generate_cfg(
+        tmp_path,
+        "./variants",
+        variants_per_source=3,
+        semantic_prompts=["delete object", "remove the object"],
+        batch_size=3,
+    )
+
+    rows = _run(cfg)
+
+    # Semantic gets one call per prompt, structural one inpaint for all its offsets.
+    assert backend.calls == [
+        ("delete object", 3),
+        ("remove the object", 3),
+        ("repair hole", 3),
+    ]
+    per_task: dict[str, int] = {}
+    for row in rows:
+        per_task[str(row["edit_task"])] = per_task.get(str(row["edit_task"]), 0) + 1
+    assert per_task == {"semantic_edit": 6, "structural_edit": 9, "consistency_edit": 9}
+    assert len({row["sample_id"] for row in rows}) == len(rows)
+    assert len({row["result_image_path"] for row in rows}) == len(rows)
+
+    structural = [row for row in rows if row["edit_task"] == "structural_edit"][:3]
+    assert [row["metadata"]["variant"] for row in structural] == [0, 1, 2]
+    assert len({row["metadata"]["allowed_region_mask_path"] for row in structural}) == 3
+
+
+def test_structural_scale_variant_reuses_base(tmp_path: Path) -> None:
+    cfg = AppConfig.model_validate({"paths": {"project_root": str(tmp_path)}})
+    context = GenerationContext(cfg=cfg, staging_dir=tmp_path, edit_backend=_RecordingBackend())
+    generator = StructuralGenerator(context)
+    image = np.full((80, 100, 3), 40, dtype=np.uint8)
+    image[20:40, 30:50] = 200
+    mask = np.zeros((80, 100), dtype=np.uint8)
+    mask[20:40, 30:50] = 255
+    source = SourceSample(
+        source_id="s0",
+        dataset_category="物理变化",
+        scene="scene",
+        image_path=str(tmp_path / "img.jpg"),
+        width=100,
+        height=80,
+    )
+    prepared = PreparedSample(
+        source=source, image=image, mask=mask, out_dir=tmp_path, extra={"bbox": (30, 20, 49, 39)}
+    )
+    base = np.full_like(image, 40)
+
+    edited, allowed = generator._paste(
+        prepared, base, StructuralVariantConfig(dx=0.0, dy=0.0, scale=1.5)
+    )
+
+    # 20x20 ROI scaled to 30x30 about its centre.
+    moved = np.zeros_like(mask)
+    moved[15:45, 25:55] = 255
+    assert np.count_nonzero(edited[..., 0] == 200) == 900
+    assert np.array_equal(edited[..., 0] == 200, moved > 0)
+    expected = dilate_mask(np.maximum(mask, moved), cfg.qa.allowed_region_dilation_px)
+    assert np.array_equal(allowed, expected)
+    assert np.array_equal(base, np.full_like(image, 40))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+from pathlib import Path
+
+from image_edit_dataset_factory.utils.id_allocator import IdAllocator
+
+
+def _reserve_many(path: str, rounds: int, queue: mp.Queue) -> None:
+    allocator = IdAllocator(path)
+    queue.put([allocator.reserve(3) for _ in range(rounds)])
+
+
+def test_reserve_hands_out_disjoint_blocks_across_processes(tmp_path: Path) -> None:
+    path = str(tmp_path / "id_counter")
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_reserve_many, args=(path, 20, queue)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    firsts = [first for _ in procs for first in queue.get()]
+    for proc in procs:
+        proc.join()
+
+    ids = sorted(first + offset for first in firsts for offset in range(3))
+    assert ids == list(range(1, 4 * 20 * 3 + 1))
+    assert IdAllocator(path).peek() == 241
+
+
+def test_seed_runs_only_for_a_missing_counter(tmp_path: Path) -> None:
+    allocator = IdAllocator(tmp_path / "id_counter")
+    calls: list[int] = []
+
+    def _seed() -> int:
+        calls.append(1)
+        return 500
+
+    assert allocator.reserve(2, initial=_seed) == 500
+    assert allocator.reserve(1, initial=_seed) == 502
+    assert len(calls) == 1
+
+    allocator.advance_to(400)
+    assert allocator.peek() == 503
+    allocator.advance_to(900)
+    assert allocator.reserve(0) == 900
+
+    allocator.reset()
+    assert allocator.peek() is None
+    assert allocator.reserve(1) == 1
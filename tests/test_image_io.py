@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_edit_dataset_factory.core.config import EncoderProfile, EncodingConfig
+from image_edit_dataset_factory.utils.image_io import (
+    LazyImage,
+    read_image_rgb,
+    read_mask,
+    stage_source_image,
+    write_image_rgb,
+    write_mask,
+)
+
+
+def test_lazy_image_defers_decode(tmp_path: Path) -> None:
+    path = tmp_path / "img.jpg"
+    write_image_rgb(path, np.zeros((24, 40, 3), dtype=np.uint8))
+
+    handle = LazyImage(path, width=40, height=24)
+    assert handle.shape == (24, 40, 3)
+    assert not handle.is_decoded
+
+    assert handle.array.shape == (24, 40, 3)
+    assert handle.is_decoded
+    assert LazyImage(path).shape == (24, 40, 3)
+
+
+def test_stage_source_image_links_upright_jpeg(tmp_path: Path) -> None:
+    source = tmp_path / "src.jpg"
+    image = np.full((16, 24, 3), 90, dtype=np.uint8)
+    write_image_rgb(source, image)
+
+    assert stage_source_image(source, tmp_path / "out" / "source.jpg", image) in {
+        "hardlink",
+        "copy",
+    }
+    assert (tmp_path / "out" / "source.jpg").read_bytes() == source.read_bytes()
+
+
+def test_stage_source_image_encodes_rotated_or_non_jpeg(tmp_path: Path) -> None:
+    rotated = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (24, 16), (10, 20, 30)).save(rotated, exif=exif)
+    upright = read_image_rgb(rotated)
+    assert upright.shape == (24, 16, 3)
+    assert stage_source_image(rotated, tmp_path / "a.jpg", upright) == "encode"
+    assert read_image_rgb(tmp_path / "a.jpg").shape == (24, 16, 3)
+
+    png = tmp_path / "src.png"
+    Image.new("RGB", (8, 8)).save(png)
+    assert stage_source_image(png, tmp_path / "b.jpg", read_image_rgb(png)) == "encode"
+
+
+def test_encoder_profiles_control_png_and_jpeg_options(tmp_path: Path) -> None:
+    encoding = EncodingConfig()
+    rng = np.random.default_rng(0)
+    mask = (rng.random((128, 128)) > 0.5).astype(np.uint8) * 255
+
+    write_mask(tmp_path / "fast.png", mask, encoding.staging_profile)
+    write_mask(tmp_path / "archive.png", mask, encoding.export_profile)
+    assert (tmp_path / "fast.png").stat().st_size > (tmp_path / "archive.png").stat().st_size
+    np.testing.assert_array_equal(read_mask(tmp_path / "fast.png"), mask)
+
+    progressive = EncoderProfile(jpeg_progressive=True, jpeg_subsampling=0)
+    write_image_rgb(tmp_path / "p.jpg", np.zeros((16, 16, 3), dtype=np.uint8), profile=progressive)
+    with Image.open(tmp_path / "p.jpg") as img:
+        assert img.info.get("progressive") == 1
+
+    with pytest.raises(ValueError):
+        EncodingConfig(staging="missing")
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import numpy as np
+
+from image_edit_dataset_factory.backends.layered_base import LayerOutput
+from image_edit_dataset_factory.utils.layer_store import (
+    LayerStore,
+    load_layer_alphas,
+    write_layer_store,
+)
+
+
+def _layer(layer_id: int, alpha: np.ndarray, image: np.ndarray) -> LayerOutput:
+    return LayerOutput(layer_id=layer_id, rgba=np.dstack([image, alpha]), alpha=alpha)
+
+
+def test_layer_store_round_trip(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, size=(40, 60, 3), dtype=np.uint8)
+
+    binary = np.zeros((40, 60), dtype=np.uint8)
+    binary[10:20, 15:35] = 255
+    soft = np.zeros((40, 60), dtype=np.uint8)
+    soft[5:30, 40:55] = 128
+    empty = np.zeros((40, 60), dtype=np.uint8)
+
+    layers = [_layer(7, binary, image), _layer(3, soft, image), _layer(12, empty, image)]
+    path = write_layer_store(tmp_path / "layers.npz", layers)
+
+    with LayerStore(path) as store:
+        assert len(store) == 3
+        assert store.layer_ids == [7, 3, 12]
+        assert store.shape == (40, 60)
+        assert store.bbox(0) == (15, 10, 35, 20)
+        np.testing.assert_array_equal(store.alpha(1), soft)
+
+        rgba = store.rgba(0)
+        np.testing.assert_array_equal(rgba[10:20, 15:35, :3], image[10:20, 15:35])
+        assert rgba[:10].max() == 0
+
+        layer = store.layer(2)
+        assert layer.layer_id == 12
+        assert layer.alpha.max() == 0
+
+    alphas = load_layer_alphas(path)
+    np.testing.assert_array_equal(alphas[0], binary)
@@ -1,9 +1,12 @@
+import json
 from pathlib import Path
 
 import numpy as np
 from PIL import Image
 
+from image_edit_dataset_factory.core.schema import LintIssue
 from image_edit_dataset_factory.qa.linter import lint_dataset
+from image_edit_dataset_factory.qa.report import write_lint_report
 
 
 def _write_rgb(path: Path) -> None:
@@ -30,3 +33,53 @@ def test_linter_catches_missing_required_files(tmp_path: Path) -> None:
     issues = lint_dataset(tmp_path)
     codes = {issue.code for issue in issues}
     assert "missing_required" in codes
+
+
+def test_linter_accepts_configured_id_width(tmp_path: Path) -> None:
+    scene = tmp_path / "semantic_edit" / "delete" / "mixed"
+    scene.mkdir(parents=True)
+
+    _write_rgb(scene / "0000001.jpg")
+    _write_rgb(scene / "0000001_result.jpg")
+    (scene / "0000001_CH.txt").write_text("编辑", encoding="utf-8")
+    (scene / "0000001_EN.txt").write_text("edit", encoding="utf-8")
+
+    assert lint_dataset(tmp_path, id_width=7) == []
+    assert {issue.code for issue in lint_dataset(tmp_path)} == {"bad_name"}
+
+
+def test_parallel_lint_reports_corruption_and_shape_once(tmp_path: Path) -> None:
+    for idx in range(6):
+        scene = tmp_path / "semantic_edit" / "delete" / f"scene_{idx}"
+        scene.mkdir(parents=True)
+        sid = f"{idx + 1:05d}"
+        _write_rgb(scene / f"{sid}.jpg")
+        (scene / f"{sid}_CH.txt").write_text("编辑", encoding="utf-8")
+        (scene / f"{sid}_EN.txt").write_text("edit", encoding="utf-8")
+        if idx == 2:
+            (scene / f"{sid}_result.jpg").write_bytes(b"not a jpeg")
+        elif idx == 4:
+            Image.fromarray(np.zeros((16, 32, 3), dtype=np.uint8)).save(scene / f"{sid}_result.jpg")
+        else:
+            _write_rgb(scene / f"{sid}_result.jpg")
+
+    issues = lint_dataset(tmp_path, workers=4)
+
+    assert issues == lint_dataset(tmp_path, workers=1)
+    assert [(Path(issue.path).parent.name, issue.code) for issue in issues] == [
+        ("scene_2", "corrupted"),
+        ("scene_4", "shape_mismatch"),
+    ]
+
+
+def test_lint_report_streams_the_json_array(tmp_path: Path) -> None:
+    issues = [
+        LintIssue(path=str(tmp_path / name), code="bad_name", message="名称") for name in ("a", "b")
+    ]
+    for items in (issues, []):
+        path, count = write_lint_report(iter(items), tmp_path)
+        expected = json.dumps(
+            [item.model_dump(mode="json") for item in items], ensure_ascii=False, indent=2
+        )
+        assert path.read_text(encoding="utf-8") == expected
+        assert count == len(items)
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from image_edit_dataset_factory.utils.image_io import read_mask, write_mask
+from image_edit_dataset_factory.utils.mask_io import MaskCache, read_binary_mask, write_binary_mask
+from image_edit_dataset_factory.utils.mask_ops import dilate_mask, invert_mask
+
+
+def _mask() -> np.ndarray:
+    mask = np.zeros((120, 160), dtype=np.uint8)
+    mask[30:70, 40:110] = 255
+    return mask
+
+
+def test_binary_mask_round_trips_as_one_bit_png(tmp_path: Path) -> None:
+    mask = _mask()
+    mask[0, 0] = 200  # thresholded like ensure_binary
+    write_binary_mask(tmp_path / "bits.png", mask)
+    write_mask(tmp_path / "gray.png", mask)
+
+    with Image.open(tmp_path / "bits.png") as img:
+        assert img.mode == "1"
+    expected = (mask > 127).astype(np.uint8) * 255
+    np.testing.assert_array_equal(read_binary_mask(tmp_path / "bits.png"), expected)
+    np.testing.assert_array_equal(read_mask(tmp_path / "bits.png"), expected)
+    np.testing.assert_array_equal(read_binary_mask(tmp_path / "gray.png"), expected)
+
+
+def test_mask_cache_computes_each_derived_mask_once() -> None:
+    cache = MaskCache(max_entries=2)
+    mask = _mask()
+
+    first = cache.dilated(mask, 5)
+    again = cache.dilated(mask.copy(), 5)
+    np.testing.assert_array_equal(first, dilate_mask(mask, pixels=5))
+    np.testing.assert_array_equal(again, first)
+    np.testing.assert_array_equal(cache.inverted(mask), invert_mask(mask))
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    cache.dilated(mask, 3)
+    assert len(cache) == 2
+    cache.dilated(mask, 5)
+    assert cache.misses == 4
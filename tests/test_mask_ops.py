@@ -1,5 +1,8 @@
 import numpy as np
 
+from image_edit_dataset_factory.backends.edit_base import inpaint_in_roi
+from image_edit_dataset_factory.backends.opencv_fallback import OpenCVFallbackBackend
+from image_edit_dataset_factory.core.config import RoiInpaintConfig
 from image_edit_dataset_factory.utils.mask_ops import (
     alpha_to_mask,
     bbox_from_mask,
@@ -7,6 +10,7 @@ from image_edit_dataset_factory.utils.mask_ops import (
     edge_error_px,
     mask_from_bbox,
     refine_mask,
+    roi_bbox,
 )
 
 
@@ -31,3 +35,40 @@ def test_edge_error() -> None:
     m2 = mask_from_bbox((32, 32), (9, 8, 21, 20))
     err = edge_error_px(m1, m2)
     assert err <= 2.0
+
+
+def test_roi_bbox_adds_margin_and_min_size_within_bounds() -> None:
+    mask = np.zeros((400, 600), dtype=np.uint8)
+    mask[100:110, 300:320] = 255
+    assert roi_bbox(mask, margin=8, min_size=0) == (292, 92, 328, 118)
+    assert roi_bbox(mask, margin=8, min_size=128) == (246, 41, 374, 169)
+
+    corner = np.zeros((400, 600), dtype=np.uint8)
+    corner[0:4, 590:600] = 255
+    assert roi_bbox(corner, margin=8, min_size=128) == (472, 0, 600, 128)
+    assert roi_bbox(np.zeros((8, 8), dtype=np.uint8), margin=8, min_size=4) is None
+
+
+def test_inpaint_in_roi_only_touches_the_crop() -> None:
+    image = np.random.default_rng(0).integers(0, 256, size=(300, 400, 3), dtype=np.uint8)
+    mask = np.zeros((300, 400), dtype=np.uint8)
+    mask[140:160, 190:210] = 255
+    seen: list[tuple[int, ...]] = []
+
+    def fill(crop: np.ndarray, crop_mask: np.ndarray) -> np.ndarray:
+        seen.append(crop.shape)
+        out = crop.copy()
+        out[crop_mask > 0] = 0
+        return out
+
+    roi = RoiInpaintConfig(margin=16, min_size=64)
+    result = inpaint_in_roi(image, mask, roi, fill)
+    assert seen == [(64, 64, 3)]
+    assert result[mask > 0].max() == 0
+    np.testing.assert_array_equal(result[mask == 0], image[mask == 0])
+
+    backend = OpenCVFallbackBackend(roi=roi)
+    full = OpenCVFallbackBackend().inpaint(image, mask)
+    cropped = backend.inpaint(image, mask)
+    assert cropped.shape == full.shape
+    np.testing.assert_array_equal(cropped[mask == 0], image[mask == 0])
@@ -1,3 +1,5 @@
+import pytest
+
 from image_edit_dataset_factory.utils.naming import (
     format_sample_id,
     instruction_ch_name,
@@ -16,6 +18,14 @@ def test_sample_id_formatting() -> None:
     assert not validate_sample_id("1234")
 
 
+def test_sample_id_width_is_configurable() -> None:
+    assert format_sample_id(123456, width=7) == "0123456"
+    assert validate_sample_id("0123456", width=7)
+    assert not validate_sample_id("0123456")
+    with pytest.raises(ValueError):
+        format_sample_id(100000)
+
+
 def test_file_naming_templates() -> None:
     sid = "00009"
     assert source_image_name(sid) == "00009.jpg"
@@ -5,6 +5,7 @@ from PIL import Image
 
 from image_edit_dataset_factory.core.config import AppConfig
 from image_edit_dataset_factory.pipeline.orchestrator import PipelineOrchestrator
+from image_edit_dataset_factory.utils.jsonl import read_jsonl
 
 CATEGORIES = ["人物物体一致性", "物体一致性", "物理变化"]
 
@@ -68,3 +69,36 @@ def test_mock_pipeline_end_to_end(tmp_path: Path) -> None:
     assert dataset_root.exists()
     assert len(list(dataset_root.rglob("*_result.jpg"))) >= 3
     assert int(summary["lint_issue_count"]) == 0
+
+
+def _streaming_cfg(tmp_path: Path, output_root: str, streaming: bool) -> AppConfig:
+    return AppConfig.model_validate(
+        {
+            "paths": {"project_root": str(tmp_path), "output_root": output_root},
+            "ingest": {"include_categories": CATEGORIES, "recursive": True},
+            "filter": {"enabled": False},
+            "backends": {"layered_backend": "mock", "edit_backend": "opencv"},
+            "decompose": {"executor": "serial"},
+            "generate": {"variants_per_source": 2},
+            "pipeline": {"streaming": streaming},
+        }
+    )
+
+
+def test_streaming_pipeline_matches_staged_run(tmp_path: Path) -> None:
+    _create_images(tmp_path / "data")
+
+    staged = PipelineOrchestrator(_streaming_cfg(tmp_path, "./staged", False)).run()
+    streamed = PipelineOrchestrator(_streaming_cfg(tmp_path, "./streamed", True)).run()
+
+    staged_rows = read_jsonl(str(staged["index_jsonl"]))
+    streamed_rows = read_jsonl(str(streamed["index_jsonl"]))
+    # Two variants each for consistency and structural; semantic has a single prompt.
+    assert len(streamed_rows) == 5
+    for left, right in zip(staged_rows, streamed_rows, strict=True):
+        assert (left["sample_id"], left["source_id"]) == (right["sample_id"], right["source_id"])
+        assert Path(str(right["result_image_path"])).exists()
+    assert streamed["lint_issue_count"] == 0
+    assert streamed["qa_fail_count"] == staged["qa_fail_count"]
+    # Results went straight from memory to the dataset; nothing was staged for them.
+    assert not list((tmp_path / "streamed" / "staging").rglob("result*.jpg"))
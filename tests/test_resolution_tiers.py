@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from image_edit_dataset_factory.backends.resolution_tiers import ResolutionTierController
+
+
+def test_controller_starts_at_remembered_tier_per_bucket() -> None:
+    ctrl = ResolutionTierController([512, 1024, 768], probe_every=0)
+    large = (1500, 1000, 3)
+    small = (300, 200, 3)
+
+    assert ctrl.plan(large) == [1024, 768, 512]
+    ctrl.record(large, 1024, False, 0.5)
+    ctrl.record(large, 768, True, 0.2)
+
+    assert ctrl.best_tier(large) == 768
+    assert ctrl.plan(large) == [768, 512]
+    # Other size buckets keep the full ladder.
+    assert ctrl.plan(small) == [1024, 768, 512]
+
+
+def test_controller_probes_one_tier_up_periodically() -> None:
+    ctrl = ResolutionTierController([1024, 768, 512], probe_every=3)
+    shape = (900, 900, 3)
+    ctrl.plan(shape)
+    ctrl.record(shape, 512, True, 0.1)
+
+    plans = [ctrl.plan(shape) for _ in range(3)]
+    assert plans == [[512], [768, 512], [512]]
+
+    ctrl.record(shape, 768, True, 0.1)
+    assert ctrl.plan(shape) == [768, 512]
+
+
+def test_controller_stats_count_attempts_and_latency() -> None:
+    ctrl = ResolutionTierController([1024, 512])
+    shape = (600, 400, 3)
+    ctrl.record(shape, 1024, False, 1.0)
+    ctrl.record(shape, 512, True, 0.25)
+    ctrl.record(shape, 512, True, 0.75)
+
+    stats = ctrl.stats()
+    assert stats[1024] == {
+        "attempts": 1,
+        "successes": 0,
+        "failures": 1,
+        "mean_latency_sec": 1.0,
+    }
+    assert stats[512]["successes"] == 2
+    assert stats[512]["mean_latency_sec"] == 0.5
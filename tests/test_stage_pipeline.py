@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from image_edit_dataset_factory.utils.stage_pipeline import run_staged
+
+
+def test_run_staged_keeps_order_and_reports_timings() -> None:
+    infer_threads: set[int] = set()
+
+    def load(item: int) -> int:
+        time.sleep((5 - item) * 0.005)
+        return item * 2
+
+    def infer(item: int, loaded: int) -> int:
+        infer_threads.add(threading.get_ident())
+        return loaded + 1
+
+    def write(item: int, loaded: int, inferred: int) -> tuple[int, int]:
+        time.sleep((5 - item) * 0.005)
+        return item, inferred
+
+    staged = run_staged(list(range(6)), load, infer, write, io_workers=3, queue_size=2)
+
+    assert staged.results == [(item, item * 2 + 1) for item in range(6)]
+    assert infer_threads == {threading.get_ident()}
+    timings = staged.timings.as_dict()
+    assert timings["items"] == 6
+    assert timings["load_sec"] > 0
+    assert timings["write_sec"] > 0
+    assert "infer_wait_sec=" in staged.timings.log_fields()
+
+
+def test_run_staged_bounds_loads_ahead_of_infer() -> None:
+    loaded_count = 0
+    lock = threading.Lock()
+    ahead: list[int] = []
+
+    def load(item: int) -> int:
+        nonlocal loaded_count
+        with lock:
+            loaded_count += 1
+        return item
+
+    def infer(item: int, loaded: int) -> int:
+        time.sleep(0.005)
+        with lock:
+            ahead.append(loaded_count - item - 1)
+        return loaded
+
+    run_staged(list(range(12)), load, infer, lambda *args: args[2], io_workers=2, queue_size=2)
+    # At most queue_size futures wait in the queue plus one the feeder is about to put.
+    assert max(ahead) <= 3
+
+
+def test_run_staged_propagates_errors() -> None:
+    def infer(item: int, loaded: int) -> int:
+        if item == 3:
+            raise RuntimeError("boom")
+        return loaded
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_staged(list(range(20)), lambda item: item, infer, lambda *args: args[2], queue_size=1)
+
+
+def test_run_staged_without_io_workers_runs_inline() -> None:
+    staged = run_staged([1, 2], lambda item: item, lambda item, x: x * 3, lambda *args: args[2], 0)
+    assert staged.results == [3, 6]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import numpy as np
+
+from image_edit_dataset_factory.backends.opencv_fallback import OpenCVFallbackBackend
+from image_edit_dataset_factory.utils.mask_ops import dilate_mask, erode_mask, refine_mask
+from image_edit_dataset_factory.utils.metrics import (
+    masked_diff_stats,
+    mse,
+    pixel_diff_ratio,
+    ssim_rgb,
+    ssim_rgb_tiled,
+)
+from image_edit_dataset_factory.utils.tiling import iter_tiles
+
+
+def _random_mask(shape: tuple[int, int], seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.random(shape) > 0.7).astype(np.uint8) * 255
+
+
+def test_iter_tiles_covers_image_once() -> None:
+    seen = np.zeros((70, 45), dtype=np.int32)
+    for tile in iter_tiles(seen.shape, tile_size=32, halo=5):
+        seen[tile.core] += 1
+        assert seen[tile.padded][tile.inner].shape == seen[tile.core].shape
+    assert np.all(seen == 1)
+
+
+def test_tiled_morphology_matches_full_frame() -> None:
+    mask = _random_mask((97, 131))
+    assert np.array_equal(dilate_mask(mask, 3, tile_size=16), dilate_mask(mask, 3))
+    assert np.array_equal(erode_mask(mask, 2, tile_size=16), erode_mask(mask, 2))
+    assert np.array_equal(
+        refine_mask(mask, kernel_size=5, iterations=2, tile_size=20),
+        refine_mask(mask, kernel_size=5, iterations=2),
+    )
+
+
+def test_tiled_metrics_match_full_frame() -> None:
+    rng = np.random.default_rng(1)
+    a = rng.integers(0, 256, (61, 83, 3), dtype=np.uint8)
+    b = a.copy()
+    b[10:40, 20:60] = rng.integers(0, 256, (30, 40, 3), dtype=np.uint8)
+    ignore = np.zeros(a.shape[:2], dtype=bool)
+    ignore[15:25, 25:35] = True
+
+    expected = a.copy()
+    expected[ignore] = b[ignore]
+    # Tile size 20 leaves a one-row core in the last row of tiles.
+    assert np.isclose(ssim_rgb_tiled(a, b, ignore=ignore, tile_size=20), ssim_rgb(expected, b))
+
+    value, ratio = masked_diff_stats(a, b, ~ignore, tile_size=16)
+    assert np.isclose(value, mse(a[~ignore], b[~ignore]))
+    assert np.isclose(ratio, pixel_diff_ratio(a[~ignore], b[~ignore]))
+
+
+def test_tiled_inpaint_only_touches_tiles_with_mask() -> None:
+    rng = np.random.default_rng(2)
+    image = rng.integers(0, 256, (96, 96, 3), dtype=np.uint8)
+    mask = np.zeros((96, 96), dtype=np.uint8)
+    mask[70:80, 70:80] = 255
+
+    backend = OpenCVFallbackBackend(tile_size=32, tile_halo=8)
+    out = backend.inpaint(image, mask)
+
+    assert out.shape == image.shape
+    assert np.array_equal(out[:64, :64], image[:64, :64])
+    assert not np.array_equal(out[70:80, 70:80], image[70:80, 70:80])